@@ -0,0 +1,82 @@
+-- Agency extraction results (extract_agencies.py --sqlite)
+-- Tables are prefixed with "extracted_" so they can live in the same
+-- database as schema.sql (budget_bills, ...) and content-schema.sql
+-- (agencies, programs, ...) without clashing. Bills are identified by the
+-- XML file stem (e.g. "5950-S"), qualified by biennium for bills downloaded
+-- by download_bills.py/pipeline.py (e.g. "5950-S (2023-24)"). bill_number
+-- holds only the numeric part in either form, which matches the number in
+-- budget_bills.bill_number (e.g. "ESSB 5950").
+
+-- ============================================================================
+-- AGENCIES
+-- ============================================================================
+
+-- One row per normalized agency name
+CREATE TABLE IF NOT EXISTS extracted_agencies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    mention_count INTEGER NOT NULL,
+    total_appropriations REAL NOT NULL,
+    total_programs INTEGER NOT NULL
+);
+
+-- Bills mentioning each agency
+CREATE TABLE IF NOT EXISTS extracted_agency_bills (
+    agency_id INTEGER NOT NULL,
+    bill_id TEXT NOT NULL, -- e.g. "5950-S", or "5950-S (2023-24)" for downloaded bills
+    bill_number INTEGER, -- numeric part only, e.g. 5950
+    FOREIGN KEY (agency_id) REFERENCES extracted_agencies(id) ON DELETE CASCADE,
+    UNIQUE(agency_id, bill_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_extracted_agency_bills_bill ON extracted_agency_bills(bill_id);
+CREATE INDEX IF NOT EXISTS idx_extracted_agency_bills_number ON extracted_agency_bills(bill_number);
+
+-- ============================================================================
+-- APPROPRIATIONS, ACTIONS AND PROGRAMS
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS extracted_appropriations (
+    agency_id INTEGER NOT NULL,
+    bill_id TEXT NOT NULL,
+    amount REAL NOT NULL,
+    account TEXT,
+    FOREIGN KEY (agency_id) REFERENCES extracted_agencies(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_extracted_appropriations_agency ON extracted_appropriations(agency_id);
+CREATE INDEX IF NOT EXISTS idx_extracted_appropriations_bill ON extracted_appropriations(bill_id);
+
+-- Number of mentions per action type (funding, creation, transfer, ...)
+CREATE TABLE IF NOT EXISTS extracted_actions (
+    agency_id INTEGER NOT NULL,
+    action_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    FOREIGN KEY (agency_id) REFERENCES extracted_agencies(id) ON DELETE CASCADE,
+    UNIQUE(agency_id, action_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_extracted_actions_type ON extracted_actions(action_type);
+
+CREATE TABLE IF NOT EXISTS extracted_programs (
+    agency_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    FOREIGN KEY (agency_id) REFERENCES extracted_agencies(id) ON DELETE CASCADE,
+    UNIQUE(agency_id, name)
+);
+
+-- ============================================================================
+-- RELATIONSHIPS
+-- ============================================================================
+
+-- Directed edges of agency-network.json
+CREATE TABLE IF NOT EXISTS extracted_relationships (
+    agency_id INTEGER NOT NULL,
+    related_agency_id INTEGER NOT NULL,
+    relationship_type TEXT NOT NULL, -- transfer, transfer_from, collaboration, oversees, overseen_by
+    FOREIGN KEY (agency_id) REFERENCES extracted_agencies(id) ON DELETE CASCADE,
+    FOREIGN KEY (related_agency_id) REFERENCES extracted_agencies(id) ON DELETE CASCADE,
+    UNIQUE(agency_id, related_agency_id, relationship_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_extracted_relationships_related ON extracted_relationships(related_agency_id);
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark for program extraction and action classification.
+
+Runs the original per-suffix program regexes and ProgramMatcher over the
+largest checked-in bill (SB 5950-S) and over synthetic runs of words that
+never end in a program suffix, the worst case for the backtracking regex.
+Then classifies the context window of every agency mention in the bill
+with the original detect_action_context loop and with ActionClassifier.
+Finally finds the parent of every Department tag in each checked-in bill
+with the original whole-tree scan and with the child -> parent map of
+extract_departments. Exits non-zero if the implementations disagree or
+ProgramMatcher exceeds its budget.
+"""
+
+import argparse
+import contextlib
+import io
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from extract_agencies import DEFAULT_BILLS_DIR, ActionClassifier, AgencyExtractor, ProgramMatcher
+
+DEFAULT_XML = Path(__file__).resolve().parents[3] / 'bills' / 'SB-5950-S' / 'raw' / '5950-S.xml'
+
+LEGACY_PATTERNS = [
+    r'[\w\s]+ program',
+    r'[\w\s]+ initiative',
+    r'[\w\s]+ project',
+    r'[\w\s]+ service',
+]
+
+
+def legacy_finditer(text: str):
+    """Program matches as found by the original regexes."""
+    for pattern in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            yield match.span()
+
+
+def legacy_detect_action_context(action_patterns, text: str):
+    """Action categories as found by the original pattern loop."""
+    actions = set()
+    text_lower = text.lower()
+    for action_type, patterns in action_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text_lower):
+                actions.add(action_type)
+                break
+    return actions
+
+
+def legacy_department_parents(root: ET.Element, department_tag: str):
+    """Each Department's parent as found by the original scan of the whole tree."""
+    found = []
+    for dept in root.iter(department_tag):
+        parent = None
+        for elem in root.iter():
+            if dept in list(elem):
+                parent = elem
+                break
+        found.append(parent)
+    return found
+
+
+def department_parents(root: ET.Element, department_tag: str):
+    """Each Department's parent through a child -> parent map, as in extract_departments."""
+    parents = {child: parent for parent in root.iter() for child in parent}
+    return [parents.get(dept) for dept in root.iter(department_tag)]
+
+
+def mention_contexts(extractor: AgencyExtractor, text: str):
+    """The +-200 character windows classified for each agency mention."""
+    matches = extractor.agency_matcher.scan(text)
+    contexts = []
+    for index in range(len(extractor.agency_patterns)):
+        for start, end in matches.finditer(index):
+            contexts.append(text[max(0, start - 200):end + 200])
+    return contexts
+
+
+def timed(function, *args):
+    """Return (seconds, result) of function(*args)."""
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress benchmark program extraction')
+    parser.add_argument('--xml', type=Path, default=DEFAULT_XML,
+                        help='Bill XML to benchmark (default: SB 5950-S)')
+    parser.add_argument('--words', type=int, nargs='+', default=[1000, 2000, 4000],
+                        help='Word counts of the synthetic worst-case runs')
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='Maximum seconds ProgramMatcher may take on any input')
+    parser.add_argument('--department-xml', type=Path, nargs='+',
+                        default=sorted(DEFAULT_BILLS_DIR.glob('*/raw/*.xml')),
+                        help='Bill XMLs for the Department parent lookup (default: checked-in bills)')
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Only time the new implementations (no comparison)')
+    args = parser.parse_args()
+
+    matcher = ProgramMatcher()
+    failures = []
+
+    text = ''.join(ET.parse(args.xml).getroot().itertext())
+    inputs = [(args.xml.name, text)]
+    inputs += [(f"{words} words", 'word ' * words + '.') for words in args.words]
+
+    print(f"{'input':>14} {'chars':>10} {'regex':>9} {'matcher':>9} {'matches':>8}")
+    for name, sample in inputs:
+        seconds, spans = timed(lambda: list(matcher.finditer(sample)))
+        if args.skip_legacy:
+            legacy = '-'
+        else:
+            legacy_seconds, legacy_spans = timed(lambda: list(legacy_finditer(sample)))
+            legacy = f"{legacy_seconds:.3f}s"
+            if legacy_spans != spans:
+                failures.append(f"{name}: matches differ from the regexes")
+        print(f"{name:>14} {len(sample):>10} {legacy:>9} {seconds:>8.3f}s {len(spans):>8}")
+        if seconds > args.budget:
+            failures.append(f"{name}: {seconds:.3f}s exceeds budget of {args.budget}s")
+
+    extractor = AgencyExtractor()
+    contexts = mention_contexts(extractor, text)
+    patterns = extractor.action_patterns
+    print(f"\nAction classification of {len(contexts)} context windows "
+          f"({len(set(contexts))} distinct)")
+    legacy_seconds, legacy_actions = timed(
+        lambda: [legacy_detect_action_context(patterns, context) for context in contexts])
+    print(f"{'original loop':>22} {len(contexts) / legacy_seconds:>10,.0f} calls/s")
+    for label, cache_size in (('ActionClassifier', 0), ('ActionClassifier+cache', 4096)):
+        classifier = ActionClassifier(patterns, cache_size=cache_size)
+        seconds, actions = timed(lambda: [set(classifier.classify(context)) for context in contexts])
+        print(f"{label:>22} {len(contexts) / seconds:>10,.0f} calls/s")
+        if actions != legacy_actions:
+            failures.append(f"{label}: action categories differ from the original loop")
+
+    department_tag = extractor.department_tag
+    print(f"\n{'Department parents':>22} {'depts':>6} {'elements':>9} {'scan':>9} {'map':>9}")
+    for xml_file in args.department_xml:
+        root = ET.parse(xml_file).getroot()
+        elements = sum(1 for _ in root.iter())
+        seconds, parents = timed(department_parents, root, department_tag)
+        if args.skip_legacy:
+            legacy = '-'
+        else:
+            legacy_seconds, legacy_parents = timed(legacy_department_parents, root, department_tag)
+            legacy = f"{legacy_seconds:.3f}s"
+            if legacy_parents != parents:
+                failures.append(f"{xml_file.name}: Department parents differ from the original scan")
+        print(f"{xml_file.name:>22} {len(parents):>6} {elements:>9} {legacy:>9} {seconds:>8.3f}s")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds, _ = timed(AgencyExtractor().extract_agencies_from_xml, args.xml)
+    print(f"\nFull extraction of {args.xml.name}: {seconds:.2f}s")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Benchmark and golden-output regression suite for the extraction pipeline.
+
+Runs AgencyExtractor end to end (extract_agencies_from_xml on every bill,
+extract_relationships, generate_agency_index, generate_agency_network,
+generate_markdown_report) on the checked-in bills and on synthetic
+corpora of generated bill XML in the WA doc: schema, scaled to multiples
+of the checked-in corpus size. Prints the time of each step, throughput
+in MB/s and peak RSS per corpus (each corpus runs in a fresh process).
+
+The index and network built from the checked-in bills are compared with
+the golden copies in golden/, and results read back from ExtractionCache
+are compared with a fresh extraction; exits non-zero if they differ.
+After an intended output change, refresh the copies with --update-golden.
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import math
+import multiprocessing
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from extract_agencies import (DEFAULT_BILLS_DIR, DOC_NAMESPACE, AgencyExtractor,
+                              ExtractionCache, extract_file)
+
+GOLDEN_DIR = Path(__file__).resolve().parent / 'golden'
+GOLDEN_FILES = ('agency-index.json.gz', 'agency-network.json.gz')
+
+STEPS = ('extract_agencies_from_xml', 'extract_relationships', 'generate_agency_index',
+         'generate_agency_network', 'generate_markdown_report')
+STEP_LABELS = ('extract', 'relations', 'index', 'network', 'report')
+
+# Vocabulary of the synthetic bills
+AGENCY_KINDS = ['Department of', 'Office of', 'Board of', 'Commission on',
+                'Council on', 'Division of', 'Center for', 'Task Force on']
+QUALIFIERS = ['Rural', 'Coastal', 'Tribal', 'Urban', 'Youth', 'Regional', 'Statewide',
+              'Community', 'Workforce', 'Climate', 'Water', 'Energy', 'Forest', 'Marine',
+              'Housing', 'Veterans', 'Family', 'Small Business', 'Public Safety', 'Digital']
+TOPICS = ['Ecology', 'Health', 'Commerce', 'Licensing', 'Transportation', 'Fish and Wildlife',
+          'Natural Resources', 'Corrections', 'Revenue', 'Agriculture', 'Early Learning',
+          'Labor and Industries', 'Social and Health Services', 'Financial Management',
+          'Public Instruction', 'Emergency Management', 'Housing Finance', 'Archives',
+          'Parks and Recreation', 'Enterprise Services']
+PROGRAM_SUFFIXES = ['program', 'initiative', 'project', 'service']
+ACCOUNTS = ['General Fund—State Appropriation', 'General Fund—Federal Appropriation',
+            'Climate Commitment Account—State Appropriation',
+            'Model Toxics Control Operating Account—State Appropriation',
+            'Education Legacy Trust Account—State Appropriation']
+# Agency names are always followed by '.', ';' or '(' so the greedy agency
+# patterns stop at the name, as they mostly do in real bills
+SENTENCES = [
+    '{amount} of the general fund—state appropriation for fiscal year {year} is provided '
+    'solely for the {program} of the {agency}.',
+    'To carry out the {program}, the following must collaborate: the {agency}; the {other}.',
+    'Funding for the {program} is transferred to the {other}; the sending agency is the {agency}.',
+    'The {program} is subject to oversight and audit by the {other}; it is administered '
+    'by the {agency} (the lead agency).',
+    'Reports on the {program} must be submitted by December 1, {year}, by the {agency}.',
+    'A new grant program is established in the {agency}.',
+    'Amounts provided in this subsection may not be used for any other purpose.',
+]
+BILL_BYTES = 2 * 1024 * 1024
+
+
+def format_amount(value: int) -> str:
+    return f"${value:,}"
+
+
+def write_synthetic_bill(path: Path, bill_number: int, target_bytes: int,
+                         agencies: List[str], programs: List[str], rng: random.Random) -> None:
+    """Write one generated bill of about target_bytes in the WA doc: schema."""
+    section = 100
+
+    def sentence() -> str:
+        return rng.choice(SENTENCES).format(
+            amount=format_amount(rng.randrange(10, 50_000) * 1000),
+            year=rng.choice((2024, 2025)),
+            agency=rng.choice(agencies),
+            other=rng.choice(agencies),
+            program=rng.choice(programs),
+        )
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>'
+                f'<CertifiedBill type="sl" xmlns="{DOC_NAMESPACE}"><Bill type="bill">'
+                f'<BillHeading><ShortBillId>SSB {bill_number}</ShortBillId>'
+                f'<BillTitle>AN ACT Relating to {escape(sentence())}</BillTitle></BillHeading>'
+                '<BillBody>\n')
+        while f.tell() < target_bytes:
+            section += 1
+            agency = rng.choice(agencies)
+            f.write('<BillSection type="new"><BillSectionHeader><BillSectionNumber>'
+                    f'<TextRun>Sec. </TextRun><Value>{section}</Value><TextRun>.  </TextRun>'
+                    f'</BillSectionNumber><Department><Index>{escape(agency.upper())}</Index>'
+                    f'<DeptName><P>FOR THE {escape(agency.upper())}</P></DeptName></Department>'
+                    '</BillSectionHeader>\n<Appropriations>')
+            for _ in range(rng.randint(1, 4)):
+                account = f"{rng.choice(ACCOUNTS)} (FY {rng.choice((2024, 2025))})"
+                amount = format_amount(rng.randrange(100, 500_000) * 1000)
+                f.write(f'<Appropriation><AccountName><BudgetP>{escape(account)}</BudgetP>'
+                        f'</AccountName><DollarAmount>{amount}</DollarAmount></Appropriation>')
+            f.write('</Appropriations>\n')
+            for number in range(1, rng.randint(3, 12)):
+                text = ' '.join(sentence() for _ in range(rng.randint(1, 3)))
+                f.write(f'<P>({number}) {escape(text)}</P>\n')
+            f.write('</BillSection>\n')
+        f.write('</BillBody></Bill></CertifiedBill>\n')
+
+
+def write_synthetic_corpus(directory: Path, total_bytes: int, scale: float) -> List[Path]:
+    """
+    Generate bills of about BILL_BYTES each adding up to total_bytes.
+
+    The number of distinct agencies grows with the square root of the
+    scale, so larger corpora also stress the relationship step.
+    """
+    rng = random.Random(f"synthetic-{scale}")
+    names = [f"{kind} {qualifier} {topic}"
+             for kind in AGENCY_KINDS for qualifier in QUALIFIERS for topic in TOPICS]
+    rng.shuffle(names)
+    agencies = names[:min(len(names), int(500 * math.sqrt(scale)))]
+    programs = [f"{qualifier} {topic} {suffix}".lower()
+                for qualifier in QUALIFIERS for topic in TOPICS for suffix in PROGRAM_SUFFIXES]
+
+    count = max(1, math.ceil(total_bytes / BILL_BYTES))
+    paths = []
+    for index in range(count):
+        path = directory / f"{9000 + index}-S.xml"
+        write_synthetic_bill(path, 9000 + index, total_bytes // count, agencies, programs, rng)
+        paths.append(path)
+    return paths
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def load_golden(golden_dir: Path):
+    with gzip.open(golden_dir / GOLDEN_FILES[0], 'rt', encoding='utf-8') as f:
+        index = json.load(f)
+    with gzip.open(golden_dir / GOLDEN_FILES[1], 'rt', encoding='utf-8') as f:
+        network = json.load(f)
+    return index, network
+
+
+def write_golden(golden_dir: Path, index: Dict, network: Dict) -> None:
+    """
+    Write the golden copies. Keys are sorted and edges sorted and renumbered
+    (their order follows set iteration), so reruns give identical files.
+    """
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    edges = sorted(network['edges'], key=lambda e: (e['source'], e['target'], e['type']))
+    network = {
+        'nodes': network['nodes'],
+        'edges': [{**edge, 'id': edge_id} for edge_id, edge in enumerate(edges)],
+    }
+    for name, value in zip(GOLDEN_FILES, (index, network)):
+        # mtime=0 keeps the gzip header stable
+        with gzip.GzipFile(golden_dir / name, 'wb', mtime=0) as raw:
+            with io.TextIOWrapper(raw, encoding='utf-8') as f:
+                json.dump(value, f, indent=2, sort_keys=True, default=list)
+                f.write('\n')
+
+
+def compare_outputs(index: Dict, network: Dict, golden_index: Dict,
+                    golden_network: Dict) -> List[str]:
+    """Differences from the golden copies (edge order is not significant)."""
+    # Round-trip through JSON so sets and tuples compare like the golden copies
+    index = json.loads(json.dumps(index, default=list))
+    network = json.loads(json.dumps(network, default=list))
+    problems = []
+
+    def report(file_name: str, what: str, keys) -> None:
+        if keys:
+            examples = ', '.join(repr(key) for key in sorted(keys)[:3])
+            problems.append(f"{file_name}: {len(keys)} {what}, e.g. {examples}")
+
+    report('agency-index.json', 'agencies missing', golden_index.keys() - index.keys())
+    report('agency-index.json', 'unexpected agencies', index.keys() - golden_index.keys())
+    report('agency-index.json', 'agencies changed',
+           [name for name in golden_index.keys() & index.keys()
+            if golden_index[name] != index[name]])
+
+    nodes = {node['id']: node for node in network['nodes']}
+    golden_nodes = {node['id']: node for node in golden_network['nodes']}
+    report('agency-network.json', 'nodes missing', golden_nodes.keys() - nodes.keys())
+    report('agency-network.json', 'unexpected nodes', nodes.keys() - golden_nodes.keys())
+    report('agency-network.json', 'nodes changed',
+           [name for name in golden_nodes.keys() & nodes.keys()
+            if golden_nodes[name] != nodes[name]])
+
+    edges = Counter((e['source'], e['target'], e['type']) for e in network['edges'])
+    golden_edges = Counter((e['source'], e['target'], e['type']) for e in golden_network['edges'])
+    report('agency-network.json', 'edges missing', list((golden_edges - edges).elements()))
+    report('agency-network.json', 'unexpected edges', list((edges - golden_edges).elements()))
+    return problems
+
+
+def run_pipeline(xml_files: List[Path], golden_dir: Optional[Path] = None,
+                 update_golden: bool = False) -> Dict:
+    """
+    Time every step of the pipeline on xml_files (meant to run in a fresh
+    process, so peak RSS belongs to this corpus alone). With golden_dir,
+    also compare the outputs with the golden copies, or replace them.
+    """
+    seconds = dict.fromkeys(STEPS, 0.0)
+    extractor = AgencyExtractor()
+
+    def timed(step: str, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        seconds[step] += time.perf_counter() - started
+        return result
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for xml_file in xml_files:
+            timed('extract_agencies_from_xml', extractor.extract_agencies_from_xml, xml_file)
+        timed('extract_relationships', extractor.extract_relationships)
+        index = timed('generate_agency_index', extractor.generate_agency_index)
+        network = timed('generate_agency_network', extractor.generate_agency_network)
+        timed('generate_markdown_report', extractor.generate_markdown_report, index, network)
+
+    result = {
+        'files': len(xml_files),
+        'bytes': sum(xml_file.stat().st_size for xml_file in xml_files),
+        'agencies': len(index),
+        'edges': len(network['edges']),
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'problems': [],
+    }
+    if golden_dir is not None:
+        if update_golden:
+            write_golden(golden_dir, index, network)
+        elif not all((golden_dir / name).exists() for name in GOLDEN_FILES):
+            result['problems'] = [f"no golden copies in {golden_dir} (create them with --update-golden)"]
+        else:
+            result['problems'] = compare_outputs(index, network, *load_golden(golden_dir))
+    return result
+
+
+def check_cache(xml_file: Path, work_dir: Optional[Path] = None) -> List[str]:
+    """
+    Differences between fresh and cached results for two byte-identical
+    copies of xml_file under different names (so different bill ids).
+    """
+    def summary(agencies) -> Dict:
+        return {name: (sorted(record.bills), record.mentions) for name, record in agencies.items()}
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+        directory = Path(directory)
+        copies = [directory / 'a' / xml_file.name, directory / 'b' / f"{xml_file.stem}.E.xml"]
+        cache = ExtractionCache(directory / 'cache', 1 << 30)
+        fresh = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for copy in copies:
+                copy.parent.mkdir()
+                shutil.copyfile(xml_file, copy)
+                agencies, _ = extract_file(copy, snapshot=False)
+                fresh[copy] = summary(agencies)
+                cache.put(cache.key(copy), agencies)
+        problems = []
+        for copy in copies:
+            cached = cache.get(cache.key(copy))
+            if cached is None or summary(cached) != fresh[copy]:
+                problems.append(f"cache: results for {copy.name} differ from a fresh extraction")
+        return problems
+
+
+def run_isolated(*args) -> Dict:
+    """run_pipeline in a freshly spawned process."""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_pipeline, *args).result()
+
+
+def print_result(name: str, result: Dict) -> None:
+    megabytes = result['bytes'] / 1_000_000
+    seconds = result['seconds']
+    total = sum(seconds.values())
+    extract = seconds['extract_agencies_from_xml']
+    cells = ' '.join(f"{seconds[step]:>9.2f}s" for step in STEPS)
+    print(f"{name:>14} {result['files']:>6} {megabytes:>8.1f} {result['agencies']:>9} "
+          f"{cells} {total:>9.2f}s {megabytes / extract:>7.2f} {megabytes / total:>7.2f} "
+          f"{result['peak_rss_mb']:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the extraction pipeline '
+                                                 'and check its outputs against golden copies')
+    parser.add_argument('--bills-dir', type=Path, default=DEFAULT_BILLS_DIR,
+                        help="Directory searched recursively for the checked-in bill XML "
+                             "(default: the repository's bills/)")
+    parser.add_argument('--golden-dir', type=Path, default=GOLDEN_DIR,
+                        help='Directory of the golden agency-index/agency-network copies')
+    parser.add_argument('--update-golden', action='store_true',
+                        help='Replace the golden copies with the current outputs')
+    parser.add_argument('--scales', type=float, nargs='*', default=[10],
+                        help='Synthetic corpus sizes as multiples of the checked-in corpus '
+                             '(e.g. 10 100; none to skip)')
+    parser.add_argument('--work-dir', type=Path,
+                        help='Where to generate synthetic corpora (default: a temporary directory)')
+    parser.add_argument('--json', type=Path,
+                        help='Also write the results to this JSON file, to compare runs')
+    args = parser.parse_args()
+
+    xml_files = sorted(args.bills_dir.rglob('*.xml'))
+    if not xml_files:
+        parser.error(f"no bill XML under {args.bills_dir}")
+    corpus_bytes = sum(xml_file.stat().st_size for xml_file in xml_files)
+
+    step_headers = ' '.join(f"{label:>10}" for label in STEP_LABELS)
+    print(f"{'corpus':>14} {'files':>6} {'MB':>8} {'agencies':>9} {step_headers} "
+          f"{'total':>10} {'ext MB/s':>7} {'MB/s':>7} {'RSS MB':>8}")
+
+    results = {}
+    results['checked-in'] = run_isolated(xml_files, args.golden_dir, args.update_golden)
+    print_result('checked-in', results['checked-in'])
+
+    for scale in args.scales:
+        name = f"synthetic x{scale:g}"
+        with tempfile.TemporaryDirectory(dir=args.work_dir) as directory:
+            synthetic = write_synthetic_corpus(Path(directory), int(corpus_bytes * scale), scale)
+            results[name] = run_isolated(synthetic)
+        print_result(name, results[name])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    problems = results['checked-in']['problems'] + check_cache(xml_files[0], args.work_dir)
+    if args.update_golden:
+        print(f"\n✓ Updated golden copies in {args.golden_dir}")
+    elif problems:
+        for problem in problems:
+            print(f"✗ {problem}")
+    else:
+        print("\n✓ Outputs match the golden copies and cached results match fresh ones")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,26 +3,723 @@
 Extract and analyze agencies, programs, and organizational relationships from WA state bills.
 """
 
+import argparse
+import bisect
+import cProfile
+import hashlib
+import heapq
+import html
+import inspect
 import json
+import os
+import pickle
+import pstats
+import random
 import re
+import sqlite3
+import sys
+import time
+import tracemalloc
 import xml.etree.ElementTree as ET
+from array import array
 from collections import defaultdict, Counter
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
-import html
+from typing import Dict, List, Optional, Set, Tuple
 
+# Bump whenever extraction results change, so cached per-bill results
+# (see ExtractionCache) are rebuilt instead of reused
+EXTRACTOR_VERSION = 2
+
+# Bump whenever the BillSnapshot layout changes, so stored snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+
+# Namespace of the bill XML documents
+DOC_NAMESPACE = 'http://leg.wa.gov/2012/document'
+
+# Bill XML files are discovered recursively under the repository's bills/
+DEFAULT_BILLS_DIR = Path(__file__).resolve().parents[3] / 'bills'
+
+# First directory of bills mirrored by download_bills.py (<biennium>/Xml/Bills/...)
+BIENNIUM_PATTERN = re.compile(r'\d{4}-\d{2}')
+
+# Action types whose contexts the relationship step scans for other agencies
+RELATIONSHIP_ACTIONS = ('transfer', 'collaboration', 'oversight')
+
+# Where one action context ends up: (text buffer, start, end)
+ContextRef = Tuple[str, int, int]
+
+
+class ContextSample:
+    """
+    Contexts kept for one agency and action type.
+
+    With size 0 every context is kept. Otherwise at most ``size`` are kept
+    as a uniform reservoir sample of the ``seen`` contexts, so memory stays
+    bounded however often the agency is mentioned.
+    """
+
+    __slots__ = ('size', 'seen', 'items')
+
+    def __init__(self, size: int = 0):
+        self.size = size
+        self.seen = 0
+        self.items: List[ContextRef] = []
+
+    def add(self, ref: ContextRef, rng: random.Random) -> None:
+        self.seen += 1
+        if not self.size or len(self.items) < self.size:
+            self.items.append(ref)
+        else:
+            slot = rng.randrange(self.seen)
+            if slot < self.size:
+                self.items[slot] = ref
+
+    def merge(self, other: 'ContextSample', rng: random.Random) -> None:
+        """Combine with a sample of other contexts, keeping it uniform."""
+        if not self.size or len(self.items) + len(other.items) <= self.size:
+            self.items.extend(other.items)
+        else:
+            # Weighted sampling without replacement (Efraimidis-Spirakis):
+            # each kept item stands for seen / len(items) contexts
+            weighted = [(self.seen / len(self.items), ref) for ref in self.items]
+            weighted += [(other.seen / len(other.items), ref) for ref in other.items]
+            keyed = sorted(((rng.random() ** (1 / weight), i) for i, (weight, _) in enumerate(weighted)),
+                           reverse=True)
+            self.items = [weighted[i][1] for _, i in sorted(keyed[:self.size], key=lambda k: k[1])]
+        self.seen += other.seen
+
+
+class AgencyRecord:
+    """
+    Everything collected about one agency (picklable, mergeable).
+
+    Actions are counted per action type. Contexts are only kept for
+    RELATIONSHIP_ACTIONS, as references into a per-bill text buffer
+    (see AgencyExtractor.store_contexts) rather than copied strings.
+    """
+
+    __slots__ = ('bills', 'appropriations', 'action_counts', 'contexts',
+                 'programs', 'relationships', 'total_funding', 'mentions')
 
-class AgencyExtractor:
     def __init__(self):
-        self.agencies = defaultdict(lambda: {
-            'bills': set(),
-            'appropriations': [],
-            'actions': defaultdict(list),
-            'programs': set(),
-            'relationships': defaultdict(set),
-            'total_funding': 0.0,
-            'mentions': 0
-        })
+        self.bills: Set[str] = set()
+        self.appropriations: List[Dict] = []
+        self.action_counts: Dict[str, int] = {}
+        self.contexts: Dict[str, ContextSample] = {}
+        self.programs: Set[str] = set()
+        self.relationships: Dict[str, Set[str]] = {}
+        self.total_funding = 0.0
+        self.mentions = 0
+
+    def count_action(self, action_type: str) -> None:
+        self.action_counts[action_type] = self.action_counts.get(action_type, 0) + 1
+
+    def add_context(self, action_type: str, ref: ContextRef, sample_size: int,
+                    rng: random.Random) -> None:
+        if action_type not in self.contexts:
+            self.contexts[action_type] = ContextSample(sample_size)
+        self.contexts[action_type].add(ref, rng)
+
+    def relate(self, rel_type: str, other_agency: str) -> None:
+        self.relationships.setdefault(rel_type, set()).add(other_agency)
+
+    def merge(self, other: 'AgencyRecord', rng: Optional[random.Random] = None) -> None:
+        """Fold in a record for the same agency extracted from other bills."""
+        self.bills |= other.bills
+        # Re-add amounts one at a time so totals match a serial run exactly
+        for app in other.appropriations:
+            self.appropriations.append(app)
+            self.total_funding += app['amount']
+        for action_type, count in other.action_counts.items():
+            self.action_counts[action_type] = self.action_counts.get(action_type, 0) + count
+        for action_type, sample in other.contexts.items():
+            if action_type not in self.contexts:
+                self.contexts[action_type] = ContextSample(sample.size)
+            self.contexts[action_type].merge(sample, rng or random.Random(0))
+        self.programs |= other.programs
+        for rel_type, related in other.relationships.items():
+            self.relationships.setdefault(rel_type, set()).update(related)
+        self.mentions += other.mentions
+
+
+@lru_cache(maxsize=None)
+def _fold_char(char: str) -> str:
+    """Lowercase stand-in for a non-ASCII character (see fold_case)."""
+    for letter in 'abcdefghijklmnopqrstuvwxyz':
+        if re.fullmatch(letter, char, re.IGNORECASE):
+            return letter
+    lowered = char.lower()
+    # Keep the text length; nothing else can match an ASCII cue
+    return lowered if len(lowered) == 1 and not lowered.isascii() else '\0'
+
+
+def fold_case(text: str) -> str:
+    """
+    Case-fold ``text`` without changing its length, so that a lowercase
+    ASCII phrase matches the folded text wherever it matches the original
+    under re.IGNORECASE.
+    """
+    if not text.isascii():
+        table = {}
+        for char in set(text):
+            if not char.isascii() and _fold_char(char) != char.lower():
+                table[ord(char)] = _fold_char(char)
+        if table:
+            text = text.translate(table)
+    return text.lower()
+
+
+class AgencyMatcher:
+    """
+    Finds matches of all agency patterns with one precompiled scan per
+    document.
+
+    Each agency pattern is a cue phrase followed by ``[\w\s,]+``. The cues
+    are compiled once and searched case-sensitively on the fold_case copy
+    of the text, which lets the regex engine use its literal-prefix search
+    (a single IGNORECASE alternation of all cues is several times slower).
+    The greedy tail of each match is the rest of the run of ``[\w\s,]``
+    characters in the original text. Matches are reported exactly as
+    ``re.finditer(pattern, text, re.IGNORECASE)`` would report them.
+    """
+
+    TAIL = r'[\w\s,]+'
+
+    def __init__(self, patterns: List[str]):
+        self.cue_regexes = []
+        for pattern in patterns:
+            if not pattern.endswith(self.TAIL):
+                raise ValueError(f"Agency pattern must end with {self.TAIL}: {pattern}")
+            cue = pattern[:-len(self.TAIL)]
+            if cue != cue.lower() or not cue.isascii():
+                raise ValueError(f"Agency cue must be lowercase ASCII: {pattern}")
+            self.cue_regexes.append(re.compile(cue))
+        self.run_regex = re.compile(r'[\w\s,]*')
+
+    def scan(self, text: str, folded: Optional[str] = None) -> 'AgencyMatches':
+        """Index every agency pattern match in ``text``."""
+        return AgencyMatches(self, text, folded)
+
+
+class AgencyMatches:
+    """Cue occurrences of one document, grouped by agency pattern."""
+
+    def __init__(self, matcher: AgencyMatcher, text: str,
+                 folded: Optional[str] = None):
+        # Per pattern: cue starts, cue ends and end of the [\w\s,] run
+        # that follows (only cues followed by at least one run character)
+        self.starts: List[List[int]] = []
+        self.cue_ends: List[List[int]] = []
+        self.run_ends: List[List[int]] = []
+
+        if folded is None:
+            folded = fold_case(text)
+        run_match = matcher.run_regex.match
+        for cue_regex in matcher.cue_regexes:
+            starts, cue_ends, run_ends = [], [], []
+            for cue in cue_regex.finditer(folded):
+                run_end = run_match(text, cue.end()).end()
+                if run_end > cue.end():
+                    starts.append(cue.start())
+                    cue_ends.append(cue.end())
+                    run_ends.append(run_end)
+            self.starts.append(starts)
+            self.cue_ends.append(cue_ends)
+            self.run_ends.append(run_ends)
+
+    def finditer(self, index: int):
+        """
+        Yield (start, end) of each match of pattern ``index`` in the text.
+
+        Equivalent to re.finditer over the whole text: a match consumes the
+        whole run, so later cues inside the same run are skipped.
+        """
+        consumed = 0
+        for start, run_end in zip(self.starts[index], self.run_ends[index]):
+            if start >= consumed:
+                consumed = run_end
+                yield start, run_end
+
+    def last_in_window(self, index: int, window_start: int,
+                       window_end: int) -> Optional[Tuple[int, int]]:
+        """
+        (start, end) of the last match of pattern ``index`` in
+        ``text[window_start:window_end]``, as if the regex had been run on
+        that slice, or None.
+        """
+        starts = self.starts[index]
+        first = bisect.bisect_left(starts, window_start)
+        # Cues must end before the window does, leaving room for the tail
+        last = bisect.bisect_left(self.cue_ends[index], window_end) - 1
+        if last < first:
+            return None
+
+        # Within one run only the first visible cue starts a match
+        run_end = self.run_ends[index][last]
+        while last > first and self.run_ends[index][last - 1] == run_end:
+            last -= 1
+        return starts[last], min(run_end, window_end)
+
+
+class ProgramMatcher:
+    """
+    Finds program/initiative/project/service phrases in linear time.
+
+    Equivalent to ``re.finditer(r'[\w\s]+ <suffix>', text, re.IGNORECASE)``
+    for each suffix in turn, without the regex's backtracking: that pattern
+    is retried at every offset of a run of ``[\w\s]`` characters and each
+    attempt rescans the rest of the run, which is quadratic in the run
+    length. Within one run the regex can only ever match once, from the
+    start of the run to the end of the last `` <suffix>`` in it, so the text
+    is split into runs once and each run is searched backwards from its end.
+    """
+
+    SUFFIXES = ('program', 'initiative', 'project', 'service')
+
+    def __init__(self, suffixes: Tuple[str, ...] = SUFFIXES):
+        self.phrases = [' ' + suffix.lower() for suffix in suffixes]
+        self.run_regex = re.compile(r'[\w\s]+')
+
+    def finditer(self, text: str, folded: Optional[str] = None):
+        """Yield (start, end) of each phrase, suffix by suffix."""
+        if folded is None:
+            folded = fold_case(text)
+        runs = [run.span() for run in self.run_regex.finditer(text)]
+        for phrase in self.phrases:
+            for run_start, run_end in runs:
+                # The leading [\w\s]+ needs at least one character
+                found = folded.rfind(phrase, run_start + 1, run_end)
+                if found != -1:
+                    yield run_start, found + len(phrase)
+
+
+class AgencyNameMatcher:
+    """
+    Finds which of a large set of names occur as substrings of a text.
+
+    Names are bucketed by their first ``key_length`` characters (the length
+    of the shortest name), so only text offsets where some name can begin
+    are examined. At such an offset, the names that are prefixes of the
+    remaining text are found by binary search in the sorted bucket: the
+    largest name not after the text is either a prefix of it, or shares a
+    shorter common prefix with it that bounds the next search. Each step
+    shortens that bound, so a lookup costs a few bisections instead of one
+    substring test per name.
+    """
+
+    def __init__(self, names):
+        names = sorted(set(names))
+        self.key_length = min((len(name) for name in names), default=0)
+        self.buckets: Dict[str, List[str]] = defaultdict(list)
+        for name in names:
+            self.buckets[name[:self.key_length]].append(name)
+
+    def _prefixes(self, bucket: List[str], text: str, found: Set[str]) -> None:
+        """Add every name in bucket that is a prefix of text to found."""
+        limit = text
+        high = len(bucket)
+        while len(limit) >= self.key_length:
+            index = bisect.bisect_right(bucket, limit, 0, high) - 1
+            if index < 0:
+                return
+            candidate = bucket[index]
+            if text.startswith(candidate):
+                found.add(candidate)
+                limit = candidate[:-1]
+            else:
+                common = 0
+                while candidate[common] == limit[common]:
+                    common += 1
+                limit = limit[:common]
+            high = index
+
+    def find(self, text: str) -> Set[str]:
+        """Names that occur anywhere in text."""
+        found: Set[str] = set()
+        if not self.buckets:
+            return found
+        key_length = self.key_length
+        buckets = self.buckets
+        for start in range(len(text) - key_length + 1):
+            bucket = buckets.get(text[start:start + key_length])
+            if bucket:
+                self._prefixes(bucket, text[start:], found)
+        return found
+
+
+class ActionClassifier:
+    """
+    Tags the action categories (funding, creation, ...) found in a text.
+
+    Every pattern is compiled once, together with the literal text it must
+    start with. The literal is checked with a plain substring test, which
+    is far cheaper than a regex search, so most patterns are ruled out
+    without running the regex at all. A category stops at its first hit.
+    Results are cached, as the same context window is often classified
+    more than once.
+
+    One combined regex with a named group per category was tried as well;
+    it needs a lookahead at every offset to report overlapping matches of
+    different categories and ran at half the speed of the per-pattern
+    search.
+    """
+
+    def __init__(self, action_patterns: Dict[str, List[str]], cache_size: int = 4096):
+        self.categories = []
+        for action_type, patterns in action_patterns.items():
+            checks = []
+            for pattern in patterns:
+                literal = re.match(r'[a-z ]*', pattern).group(0)
+                # A trailing letter under a quantifier is optional
+                if pattern[len(literal):len(literal) + 1] in ('?', '*', '{'):
+                    literal = literal[:-1]
+                checks.append((literal, re.compile(pattern).search))
+            self.categories.append((action_type, checks))
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, text: str) -> frozenset:
+        text_lower = text.lower()
+        actions = []
+        for action_type, checks in self.categories:
+            for literal, search in checks:
+                if literal in text_lower and search(text_lower):
+                    actions.append(action_type)
+                    break
+        return frozenset(actions)
+
+
+# Dollar figures, optionally scaled by a directly following "million" or
+# "billion" ("$1.2 million")
+MONEY_PATTERN = re.compile(r'\$(\d[\d,]*(?:\.\d+)?)(?:\s*(million|billion)\b)?', re.IGNORECASE)
+MULTIPLIERS = {'million': 1_000_000, 'billion': 1_000_000_000}
+
+
+def parse_dollar_amounts(text: str):
+    """Yield (start, end, value) for every dollar figure in text, in one pass."""
+    for match in MONEY_PATTERN.finditer(text):
+        value = float(match.group(1).replace(',', ''))
+        if match.group(2):
+            value *= MULTIPLIERS[match.group(2).lower()]
+        yield match.start(), match.end(), value
+
+
+class AppropriationTable:
+    """
+    Appropriations of a bill (or section) as compact numeric columns.
+
+    Row i is amounts[i] dollars from account account_names[accounts[i]]
+    for fiscal year fiscal_years[i] (0 when the account line names none).
+    """
+
+    FISCAL_YEAR_PATTERN = re.compile(r'\bFY\s*(\d{4})\b')
+
+    def __init__(self):
+        self.amounts = array('d')
+        self.accounts = array('I')
+        self.fiscal_years = array('H')
+        self.account_names: List[str] = []
+        self._account_ids: Dict[str, int] = {}
+
+    @classmethod
+    def parse(cls, appropriations, namespace: Dict[str, str]) -> 'AppropriationTable':
+        """Build a table from doc:Appropriation elements."""
+        table = cls()
+        for app in appropriations:
+            amount = sum(value for _, _, value in parse_dollar_amounts(''.join(app.itertext())))
+            account_name = app.find('.//doc:AccountName', namespace)
+            account = ''.join(account_name.itertext()).strip() if account_name is not None else 'Unknown'
+            table.append(amount, account)
+        return table
+
+    def append(self, amount: float, account: str) -> None:
+        account_id = self._account_ids.get(account)
+        if account_id is None:
+            account_id = self._account_ids[account] = len(self.account_names)
+            self.account_names.append(account)
+        fiscal_year = self.FISCAL_YEAR_PATTERN.search(account)
+
+        self.amounts.append(amount)
+        self.accounts.append(account_id)
+        self.fiscal_years.append(int(fiscal_year.group(1)) if fiscal_year else 0)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def rows(self):
+        """Yield (amount, account, fiscal_year) per appropriation."""
+        for amount, account_id, fiscal_year in zip(self.amounts, self.accounts, self.fiscal_years):
+            yield amount, self.account_names[account_id], fiscal_year
+
+    def total(self) -> float:
+        return sum(self.amounts)
+
+
+def file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BillSnapshot:
+    """
+    A bill parsed once into what extraction needs, without its XML tree.
+
+    text is the bill's flattened text (''.join(root.itertext())); the other
+    fields locate elements in it as flat arrays of (start, end) offsets:
+    sections (BillSection elements, in document order) and departments (the
+    DeptName of every Department tag that has one). department_sections
+    gives the index of the BillSection directly holding each Department
+    (-1 for none), and appropriations the AppropriationTable of each section.
+
+    load() keeps the snapshot next to the XML file and reuses it while the
+    file is unchanged, so reading a bill again is a single unpickle.
+    """
+
+    SUFFIX = '.snapshot'
+    NAMESPACE = {'doc': DOC_NAMESPACE}
+    DEPARTMENT_TAG = f"{{{DOC_NAMESPACE}}}Department"
+
+    __slots__ = ('bill_id', 'text', 'sections', 'appropriations', 'departments',
+                 'department_sections')
+
+    def __init__(self, bill_id: str, text: str):
+        self.bill_id = bill_id
+        self.text = text
+        self.sections = array('I')
+        self.appropriations: List[AppropriationTable] = []
+        self.departments = array('I')
+        self.department_sections = array('i')
+
+    @classmethod
+    def from_tree(cls, root: ET.Element, bill_id: str) -> 'BillSnapshot':
+        """Build the snapshot of a parsed bill."""
+        # Offsets of every element's itertext() within the root's
+        spans: Dict[ET.Element, Tuple[int, int]] = {}
+        chunks: List[str] = []
+        offset = 0
+
+        def walk(element: ET.Element) -> None:
+            # Same traversal as Element.itertext()
+            nonlocal offset
+            start = offset
+            if isinstance(element.tag, str) or element.tag is None:
+                if element.text:
+                    chunks.append(element.text)
+                    offset += len(element.text)
+                for child in element:
+                    walk(child)
+                    if child.tail:
+                        chunks.append(child.tail)
+                        offset += len(child.tail)
+            spans[element] = (start, offset)
+
+        walk(root)
+        snapshot = cls(bill_id, ''.join(chunks))
+        parents = {child: parent for parent in root.iter() for child in parent}
+
+        section_index = {}
+        for element in root.iter():
+            if isinstance(element.tag, str) and element.tag.endswith('BillSection'):
+                section_index[element] = len(section_index)
+                snapshot.sections.extend(spans[element])
+                snapshot.appropriations.append(AppropriationTable.parse(
+                    element.iterfind('.//doc:Appropriation', cls.NAMESPACE), cls.NAMESPACE))
+
+        for dept in root.iter(cls.DEPARTMENT_TAG):
+            dept_name_elem = dept.find('.//doc:DeptName', cls.NAMESPACE)
+            if dept_name_elem is not None:
+                snapshot.departments.extend(spans[dept_name_elem])
+                snapshot.department_sections.append(section_index.get(parents.get(dept), -1))
+        return snapshot
+
+    @classmethod
+    def load(cls, xml_file: Path) -> Optional['BillSnapshot']:
+        """
+        Return the snapshot of xml_file, building and storing it if there is
+        none yet or the file changed. A stored snapshot is reused while the
+        file's size and mtime are unchanged, or its SHA-256 still matches.
+        Returns None if the XML cannot be parsed.
+        """
+        path = xml_file.with_suffix(cls.SUFFIX)
+        stat = xml_file.stat()
+        digest = None
+        try:
+            with open(path, 'rb') as f:
+                header = pickle.load(f)
+                if header['version'] == SNAPSHOT_VERSION:
+                    if (header['size'], header['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+                        # Touched (e.g. downloaded again): reuse if the contents match
+                        digest = file_sha256(xml_file)
+                    if digest is None or digest == header['sha256']:
+                        snapshot = pickle.load(f)
+                        if digest is not None:
+                            cls._store(path, snapshot, stat, digest)
+                        return snapshot
+        except FileNotFoundError:
+            pass
+        except Exception as e:  # unpickling a damaged file can raise almost anything
+            print(f"  Discarding unreadable snapshot {path.name}: {e}")
+
+        try:
+            root = ET.parse(xml_file).getroot()
+        except ET.ParseError as e:
+            print(f"  Error parsing {xml_file}: {e}")
+            return None
+        snapshot = cls.from_tree(root, xml_file.stem)
+        cls._store(path, snapshot, stat, digest or file_sha256(xml_file))
+        return snapshot
+
+    @staticmethod
+    def _store(path: Path, snapshot: 'BillSnapshot', stat: os.stat_result, digest: str) -> None:
+        header = {'version': SNAPSHOT_VERSION, 'size': stat.st_size,
+                  'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # A read-only corpus still works, it is just parsed every run
+            print(f"  Could not store snapshot {path}: {e}")
+
+    def iter_departments(self):
+        """Yield (DeptName text, section text, appropriations) per Department."""
+        text = self.text
+        for index, section in enumerate(self.department_sections):
+            dept_text = text[self.departments[2 * index]:self.departments[2 * index + 1]]
+            if section < 0:
+                yield dept_text, None, None
+            else:
+                section_text = text[self.sections[2 * section]:self.sections[2 * section + 1]]
+                yield dept_text, section_text, self.appropriations[section]
+
+
+class PhaseProfiler:
+    """
+    Wall time, CPU time, matches and allocations per extraction phase.
+
+    Per-bill phases are parse (XML parsing or snapshot loading), departments
+    (Department tags and their appropriations), agencies (the agency pattern
+    scan and action classification) and programs; run-wide phases such as
+    relationships are recorded under the bill ''. Nested phases are exclusive:
+    time spent in an inner phase is not counted again in the outer one.
+    Allocations are the net change in allocated memory blocks, plus the net
+    and peak traced bytes while tracemalloc is tracing. A disabled profiler
+    records nothing.
+    """
+
+    FIELDS = ('calls', 'wall', 'cpu', 'matches', 'blocks', 'traced_bytes', 'traced_peak')
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        # (bill, phase) -> totals
+        self.records: Dict[Tuple[str, str], Dict[str, float]] = {}
+        # Totals of the phases nested in each open phase:
+        # [wall, cpu, blocks, traced bytes, traced peak]
+        self._stack: List[list] = []
+        self._scratch = dict.fromkeys(self.FIELDS, 0)
+
+    @contextmanager
+    def phase(self, name: str, bill: str = ''):
+        """Time the body as one call of a phase; add its matches to the yielded record."""
+        if not self.enabled:
+            yield self._scratch
+            return
+        record = self.records.get((bill, name))
+        if record is None:
+            record = self.records[(bill, name)] = dict.fromkeys(self.FIELDS, 0)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            traced_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        inner = [0.0, 0.0, 0, 0, 0]
+        self._stack.append(inner)
+        blocks = sys.getallocatedblocks()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            blocks = sys.getallocatedblocks() - blocks
+            traced = peak = 0
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                # Nested phases reset the peak, so take theirs into account
+                peak = max(peak, inner[4])
+                traced = current - traced_start
+                record['traced_peak'] = max(record['traced_peak'], peak - traced_start)
+            self._stack.pop()
+            record['calls'] += 1
+            record['wall'] += wall - inner[0]
+            record['cpu'] += cpu - inner[1]
+            record['blocks'] += blocks - inner[2]
+            record['traced_bytes'] += traced - inner[3]
+            if self._stack:
+                outer = self._stack[-1]
+                outer[0] += wall
+                outer[1] += cpu
+                outer[2] += blocks
+                outer[3] += traced
+                outer[4] = max(outer[4], peak)
+
+    def merge(self, records: Dict[Tuple[str, str], Dict[str, float]]) -> None:
+        """Add the records of another profiler (e.g. from a worker process)."""
+        for key, record in records.items():
+            self._add(self.records.setdefault(key, dict.fromkeys(self.FIELDS, 0)), record)
+
+    @staticmethod
+    def _add(totals: Dict[str, float], record: Dict[str, float]) -> None:
+        for field, value in record.items():
+            if field == 'traced_peak':
+                totals[field] = max(totals[field], value)
+            else:
+                totals[field] += value
+
+    def report(self) -> Dict:
+        """Timing report: totals per phase, and per bill its phases."""
+        phases: Dict[str, Dict[str, float]] = {}
+        bills: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+        for (bill, name), record in self.records.items():
+            self._add(phases.setdefault(name, dict.fromkeys(self.FIELDS, 0)), record)
+            if bill:
+                bills[bill][name] = dict(record)
+        return {'phases': phases, 'bills': dict(bills)}
+
+    def print_summary(self, slowest: int = 5) -> None:
+        report = self.report()
+        print(f"\n{'phase':<14} {'calls':>7} {'wall':>9} {'cpu':>9} {'matches':>9} {'blocks':>10}")
+        for name, totals in report['phases'].items():
+            print(f"{name:<14} {totals['calls']:>7} {totals['wall']:>8.3f}s {totals['cpu']:>8.3f}s "
+                  f"{totals['matches']:>9} {totals['blocks']:>10}")
+        bill_times = sorted(((sum(record['wall'] for record in phases.values()), bill)
+                             for bill, phases in report['bills'].items()), reverse=True)
+        if bill_times:
+            print("Slowest bills: " + ', '.join(f"{bill} ({wall:.2f}s)"
+                                                for wall, bill in bill_times[:slowest]))
+
+
+class AgencyExtractor:
+    def __init__(self, stream: bool = False, context_sample: int = 0,
+                 profiler: Optional[PhaseProfiler] = None):
+        self.agencies: Dict[str, AgencyRecord] = defaultdict(AgencyRecord)
+        # Parse bills incrementally, one BillSection at a time
+        self.stream = stream
+        # Contexts kept per agency and relationship action (0 = all)
+        self.context_sample = context_sample
+        self.rng = random.Random(0)
+        # Per-phase timings (see --profile)
+        self.profiler = profiler or PhaseProfiler(enabled=False)
 
         # Common WA state agency patterns
         self.agency_patterns = [
@@ -99,7 +796,13 @@ class AgencyExtractor:
             ],
         }
 
-        self.namespace = {'doc': 'http://leg.wa.gov/2012/document'}
+        self.action_classifier = ActionClassifier(self.action_patterns)
+
+        self.namespace = {'doc': DOC_NAMESPACE}
+        self.department_tag = f"{{{self.namespace['doc']}}}Department"
+        self.section_tag = f"{{{self.namespace['doc']}}}BillSection"
+        self.agency_matcher = AgencyMatcher(self.agency_patterns)
+        self.program_matcher = ProgramMatcher()
 
     def normalize_agency_name(self, name: str) -> str:
         """Normalize agency names for consistent identification."""
@@ -134,327 +837,490 @@ class AgencyExtractor:
 
     def extract_dollar_amount(self, text: str) -> float:
         """Extract dollar amount from text."""
-        # Look for patterns like $123,456,789 or $123.456 million
-        amounts = re.findall(r'\$[\d,]+(?:\.\d+)?', text)
-        total = 0.0
-
-        for amount in amounts:
-            try:
-                # Remove $ and commas, convert to float
-                value = float(amount.replace('$', '').replace(',', ''))
-
-                # Check for million/billion multipliers in nearby text
-                context = text[max(0, text.index(amount)-20):min(len(text), text.index(amount)+50)]
-                if 'million' in context.lower():
-                    value *= 1_000_000
-                elif 'billion' in context.lower():
-                    value *= 1_000_000_000
-
-                total += value
-            except (ValueError, AttributeError):
-                continue
-
-        return total
+        # Look for patterns like $123,456,789 or $1.2 million
+        return sum(value for _, _, value in parse_dollar_amounts(text))
 
     def detect_action_context(self, text: str) -> Set[str]:
         """Detect what actions are being performed based on text context."""
-        actions = set()
-        text_lower = text.lower()
-
-        for action_type, patterns in self.action_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    actions.add(action_type)
-                    break
-
-        return actions
+        return set(self.action_classifier.classify(text))
 
-    def extract_agencies_from_xml(self, xml_file: Path) -> None:
-        """Extract agencies and programs from a single XML bill file."""
+    def extract_agencies_from_xml(self, xml_file: Path, bill_id: Optional[str] = None) -> None:
+        """
+        Extract agencies and programs from a single XML bill file, recorded
+        under bill_id (default: the file stem).
+        """
         print(f"Processing {xml_file.name}...")
 
+        if self.stream:
+            self.extract_agencies_streaming(xml_file, bill_id)
+            return
+
+        bill_id = bill_id or xml_file.stem
         try:
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
+            with self.profiler.phase('parse', bill_id):
+                tree = ET.parse(xml_file)
+                root = tree.getroot()
         except ET.ParseError as e:
             print(f"  Error parsing {xml_file}: {e}")
             return
 
-        bill_id = xml_file.stem
-
-        # Extract from Department tags (explicit agency sections)
-        for dept in root.findall('.//doc:Department', self.namespace):
-            dept_name_elem = dept.find('.//doc:DeptName', self.namespace)
-            if dept_name_elem is not None:
-                # Get the text content
-                dept_text = ''.join(dept_name_elem.itertext()).strip()
-                # Remove "FOR THE" prefix
-                dept_text = re.sub(r'^FOR THE\s+', '', dept_text, flags=re.IGNORECASE)
-
-                agency_name = self.normalize_agency_name(dept_text)
-
-                if agency_name:
-                    self.agencies[agency_name]['bills'].add(bill_id)
-                    self.agencies[agency_name]['mentions'] += 1
-
-                    # Get parent BillSection for context - find manually
-                    section = None
-                    for elem in root.iter():
-                        if dept in list(elem):
-                            if elem.tag.endswith('BillSection'):
-                                section = elem
-                                break
-
-                    if section is not None:
-                        section_text = ''.join(section.itertext())
-
-                        # Extract appropriations
-                        appropriations = section.findall('.//doc:Appropriation', self.namespace)
-                        for app in appropriations:
-                            app_text = ''.join(app.itertext())
-                            amount = self.extract_dollar_amount(app_text)
+        self.extract_departments(root, bill_id)
 
-                            if amount > 0:
-                                account_name = app.find('.//doc:AccountName', self.namespace)
-                                account = ''.join(account_name.itertext()).strip() if account_name is not None else 'Unknown'
-
-                                self.agencies[agency_name]['appropriations'].append({
-                                    'bill': bill_id,
-                                    'amount': amount,
-                                    'account': account
-                                })
-                                self.agencies[agency_name]['total_funding'] += amount
+        # Extract from all text content to find additional agency mentions
+        with self.profiler.phase('parse', bill_id):
+            full_text = ''.join(root.itertext())
+        self.extract_mentions(full_text, bill_id)
+
+    def extract_agencies_from_snapshot(self, snapshot: BillSnapshot,
+                                       bill_id: Optional[str] = None) -> None:
+        """
+        Extract agencies and programs from a pre-parsed bill. Gives the same
+        results as extract_agencies_from_xml on the XML file it was built
+        from (--stream parses the XML instead, see extract_file).
+        """
+        bill_id = bill_id or snapshot.bill_id
+        print(f"Processing {bill_id}...")
+
+        with self.profiler.phase('departments', bill_id) as record:
+            for dept_text, section_text, appropriations in snapshot.iter_departments():
+                self.add_department(bill_id, dept_text, section_text, appropriations)
+                record['matches'] += 1
+        self.extract_mentions(snapshot.text, bill_id)
+
+    def extract_agencies_streaming(self, xml_file: Path, bill_id: Optional[str] = None) -> None:
+        """
+        Extract a bill with iterparse, keeping only one BillSection in memory.
+
+        Each BillSection is analyzed on its own as soon as it is complete,
+        then dropped from the tree. Content outside sections (bill heading,
+        title, certificate, ...) is analyzed in the largest pieces that hold
+        no section. Matches cannot span two pieces, so results can differ
+        slightly from extract_agencies_from_xml, which scans the whole text.
+        Text sitting directly inside section containers (normally only
+        whitespace) is not scanned.
+        """
+        bill_id = bill_id or xml_file.stem
+        # Open elements outside sections: [element, holds a BillSection,
+        # finished section-free children not analyzed yet]
+        stack: List[list] = []
+        in_section = False
+
+        def analyze(element: ET.Element) -> None:
+            self.extract_departments(element, bill_id)
+            self.extract_mentions(''.join(element.itertext()), bill_id)
+
+        def flush(entry: list) -> None:
+            """Analyze and drop the finished section-free children of a container."""
+            for child in entry[2]:
+                analyze(child)
+                entry[0].remove(child)
+            entry[2].clear()
 
-                        # Detect actions
-                        actions = self.detect_action_context(section_text)
-                        for action in actions:
-                            self.agencies[agency_name]['actions'][action].append({
-                                'bill': bill_id,
-                                'context': section_text[:200]
-                            })
+        try:
+            with self.profiler.phase('parse', bill_id):
+                # The parser may build elements ahead of the events reported,
+                # so only elements whose end event was seen are touched
+                for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                    if in_section:
+                        if event == 'end' and elem.tag == self.section_tag:
+                            in_section = False
+                            analyze(elem)
+                            stack[-1][0].remove(elem)
+                    elif event == 'start':
+                        if elem.tag == self.section_tag:
+                            in_section = True
+                            # Ancestors of a section are containers: analyze
+                            # what they hold so far, in document order
+                            for entry in stack:
+                                entry[1] = True
+                                flush(entry)
+                        else:
+                            stack.append([elem, False, []])
+                    else:
+                        entry = stack.pop()
+                        if entry[1]:
+                            flush(entry)
+                            if stack:
+                                stack[-1][0].remove(elem)
+                        elif stack:
+                            stack[-1][2].append(elem)
+                        else:
+                            # A bill without sections is analyzed whole
+                            analyze(elem)
+        except ET.ParseError as e:
+            print(f"  Error parsing {xml_file}: {e}")
 
-        # Extract from all text content to find additional agency mentions
-        full_text = ''.join(root.itertext())
-
-        # Find agency mentions using patterns
-        for pattern in self.agency_patterns:
-            matches = re.finditer(pattern, full_text, re.IGNORECASE)
-            for match in matches:
-                agency_name = self.normalize_agency_name(match.group(0))
-
-                if agency_name and len(agency_name) > 5:  # Filter out very short matches
-                    self.agencies[agency_name]['bills'].add(bill_id)
-                    self.agencies[agency_name]['mentions'] += 1
-
-                    # Get surrounding context for action detection
-                    start = max(0, match.start() - 200)
-                    end = min(len(full_text), match.end() + 200)
-                    context = full_text[start:end]
-
-                    actions = self.detect_action_context(context)
-                    for action in actions:
-                        self.agencies[agency_name]['actions'][action].append({
+    def extract_departments(self, element: ET.Element, bill_id: str) -> None:
+        """Record the Department tags (explicit agency sections) in element."""
+        with self.profiler.phase('departments', bill_id) as record:
+            # One pass over the tree so each Department finds its parent in O(1)
+            parents = {child: parent for parent in element.iter() for child in parent}
+
+            # Extract from Department tags (explicit agency sections)
+            for dept in element.iter(self.department_tag):
+                dept_name_elem = dept.find('.//doc:DeptName', self.namespace)
+                if dept_name_elem is not None:
+                    # Get the text content
+                    dept_text = ''.join(dept_name_elem.itertext())
+
+                    # Get parent BillSection for context
+                    section = parents.get(dept)
+                    if section is not None and not section.tag.endswith('BillSection'):
+                        section = None
+
+                    if section is None:
+                        self.add_department(bill_id, dept_text)
+                    else:
+                        appropriations = AppropriationTable.parse(
+                            section.iterfind('.//doc:Appropriation', self.namespace), self.namespace)
+                        self.add_department(bill_id, dept_text, ''.join(section.itertext()), appropriations)
+                    record['matches'] += 1
+
+    def add_department(self, bill_id: str, dept_text: str, section_text: Optional[str] = None,
+                       appropriations: Optional[AppropriationTable] = None) -> None:
+        """
+        Record one Department tag from its DeptName text and, if it sits
+        directly in a BillSection, that section's text and appropriations.
+        """
+        # Remove "FOR THE" prefix
+        dept_text = re.sub(r'^FOR THE\s+', '', dept_text.strip(), flags=re.IGNORECASE)
+
+        agency_name = self.normalize_agency_name(dept_text)
+
+        if agency_name:
+            self.agencies[agency_name].bills.add(bill_id)
+            self.agencies[agency_name].mentions += 1
+
+            if section_text is not None:
+                # Extract appropriations
+                for amount, account, _ in appropriations.rows():
+                    if amount > 0:
+                        self.agencies[agency_name].appropriations.append({
                             'bill': bill_id,
-                            'context': context[:200]
+                            'amount': amount,
+                            'account': account
                         })
+                        self.agencies[agency_name].total_funding += amount
+
+                # Detect actions
+                actions = self.detect_action_context(section_text)
+                contexts = []
+                for action in actions:
+                    self.agencies[agency_name].count_action(action)
+                    contexts.append((agency_name, action, 0, min(len(section_text), 200)))
+                self.store_contexts(section_text, contexts)
+
+    def extract_mentions(self, full_text: str, bill_id: str) -> None:
+        """Find agency mentions, their actions and programs in bill text."""
+        with self.profiler.phase('agencies', bill_id) as record:
+            folded_text = fold_case(full_text)
+            # (agency, action type, start, end) of contexts to keep
+            contexts = []
+
+            # Find agency mentions using patterns (one scan for all of them)
+            agency_matches = self.agency_matcher.scan(full_text, folded_text)
+            for index in range(len(self.agency_patterns)):
+                for match_start, match_end in agency_matches.finditer(index):
+                    record['matches'] += 1
+                    agency_name = self.normalize_agency_name(full_text[match_start:match_end])
+
+                    if agency_name and len(agency_name) > 5:  # Filter out very short matches
+                        self.agencies[agency_name].bills.add(bill_id)
+                        self.agencies[agency_name].mentions += 1
+
+                        # Get surrounding context for action detection
+                        start = max(0, match_start - 200)
+                        end = min(len(full_text), match_end + 200)
+                        context = full_text[start:end]
+
+                        actions = self.detect_action_context(context)
+                        for action in actions:
+                            self.agencies[agency_name].count_action(action)
+                            contexts.append((agency_name, action, start, min(end, start + 200)))
 
-        # Extract program mentions
-        program_patterns = [
-            r'[\w\s]+ program',
-            r'[\w\s]+ initiative',
-            r'[\w\s]+ project',
-            r'[\w\s]+ service',
-        ]
+            self.store_contexts(full_text, contexts)
 
-        for pattern in program_patterns:
-            matches = re.finditer(pattern, full_text, re.IGNORECASE)
-            for match in matches:
-                program = match.group(0).strip().title()
+        with self.profiler.phase('programs', bill_id) as record:
+            for match_start, match_end in self.program_matcher.finditer(full_text, folded_text):
+                record['matches'] += 1
+                program = full_text[match_start:match_end].strip().title()
                 if len(program) > 10 and len(program) < 100:  # Filter reasonable lengths
                     # Try to associate with nearby agency
-                    start = max(0, match.start() - 500)
-                    nearby_text = full_text[start:match.start()]
+                    start = max(0, match_start - 500)
 
-                    for agency_pattern in self.agency_patterns[:5]:  # Check main patterns
-                        agency_matches = list(re.finditer(agency_pattern, nearby_text, re.IGNORECASE))
-                        if agency_matches:
-                            agency_name = self.normalize_agency_name(agency_matches[-1].group(0))
+                    for index in range(5):  # Check main patterns
+                        nearby = agency_matches.last_in_window(index, start, match_start)
+                        if nearby:
+                            agency_name = self.normalize_agency_name(full_text[nearby[0]:nearby[1]])
                             if agency_name:
-                                self.agencies[agency_name]['programs'].add(program)
+                                self.agencies[agency_name].programs.add(program)
                                 break
 
+    def store_contexts(self, text: str, contexts: List[Tuple[str, str, int, int]]) -> None:
+        """
+        Attach the (agency, action type, start, end) contexts of text that
+        the relationship step needs to their agencies.
+
+        Only the parts of text covered by some kept context are copied, once,
+        into a buffer shared by all of them; each agency then holds offsets
+        into that buffer. Overlapping windows around nearby mentions are
+        stored a single time, and the full bill text is not kept alive.
+        """
+        contexts = [context for context in contexts if context[1] in RELATIONSHIP_ACTIONS]
+        if not contexts:
+            return
+
+        # Merge overlapping windows into spans of the buffer
+        span_starts: List[int] = []
+        span_offsets: List[int] = []
+        pieces: List[str] = []
+        offset = 0
+        span_start = span_end = None
+        for start, end in sorted((start, end) for _, _, start, end in contexts):
+            if span_end is not None and start <= span_end:
+                span_end = max(span_end, end)
+                continue
+            if span_end is not None:
+                pieces.append(text[span_start:span_end])
+                offset += span_end - span_start
+            span_starts.append(start)
+            span_offsets.append(offset)
+            span_start, span_end = start, end
+        pieces.append(text[span_start:span_end])
+        buffer = ''.join(pieces)
+
+        for agency_name, action, start, end in contexts:
+            span = bisect.bisect_right(span_starts, start) - 1
+            buffer_start = span_offsets[span] + start - span_starts[span]
+            ref = (buffer, buffer_start, buffer_start + end - start)
+            self.agencies[agency_name].add_context(action, ref, self.context_sample, self.rng)
+
+    def merge(self, agencies: Dict[str, AgencyRecord]) -> None:
+        """Merge partial results (e.g. from a worker process) into this extractor."""
+        for agency_name, record in agencies.items():
+            self.agencies[agency_name].merge(record, self.rng)
+
     def extract_relationships(self) -> None:
         """Extract relationships between agencies based on co-mentions and actions."""
-        # Build relationship graph based on transfer and collaboration actions
+        # Index every agency name once, then scan each context a single time
+        names_by_key: Dict[str, List[str]] = defaultdict(list)
+        for agency_name in self.agencies:
+            names_by_key[agency_name.lower()].append(agency_name)
+        matcher = AgencyNameMatcher(names_by_key)
+
+        # Build relationship graph based on transfer, collaboration and
+        # oversight actions: (action type, relationship, reverse relationship)
+        relationship_types = [
+            ('transfer', 'transfer', 'transfer_from'),
+            ('collaboration', 'collaboration', 'collaboration'),
+            ('oversight', 'oversees', 'overseen_by'),
+        ]
         for agency_name, agency_data in self.agencies.items():
-            # Check transfer actions
-            for transfer_action in agency_data['actions'].get('transfer', []):
-                context = transfer_action['context'].lower()
-
-                # Find other agencies mentioned in transfer context
-                for other_agency in self.agencies.keys():
-                    if other_agency != agency_name and other_agency.lower() in context:
-                        self.agencies[agency_name]['relationships']['transfer'].add(other_agency)
-                        self.agencies[other_agency]['relationships']['transfer_from'].add(agency_name)
-
-            # Check collaboration actions
-            for collab_action in agency_data['actions'].get('collaboration', []):
-                context = collab_action['context'].lower()
-
-                for other_agency in self.agencies.keys():
-                    if other_agency != agency_name and other_agency.lower() in context:
-                        self.agencies[agency_name]['relationships']['collaboration'].add(other_agency)
-                        self.agencies[other_agency]['relationships']['collaboration'].add(agency_name)
-
-            # Check oversight relationships
-            for oversight_action in agency_data['actions'].get('oversight', []):
-                context = oversight_action['context'].lower()
-
-                for other_agency in self.agencies.keys():
-                    if other_agency != agency_name and other_agency.lower() in context:
-                        self.agencies[agency_name]['relationships']['oversees'].add(other_agency)
-                        self.agencies[other_agency]['relationships']['overseen_by'].add(agency_name)
+            for action_type, relationship, reverse in relationship_types:
+                sample = agency_data.contexts.get(action_type)
+                for text, start, end in (sample.items if sample else []):
+                    # Find other agencies mentioned in the action context
+                    for key in matcher.find(text[start:end].lower()):
+                        for other_agency in names_by_key[key]:
+                            if other_agency != agency_name:
+                                agency_data.relate(relationship, other_agency)
+                                self.agencies[other_agency].relate(reverse, agency_name)
+
+    def index_entry(self, agency_name: str) -> Dict:
+        """The agency-index.json entry of one agency."""
+        agency_data = self.agencies[agency_name]
+
+        # Count actions by type
+        action_counts = dict(agency_data.action_counts)
 
-    def generate_agency_index(self) -> Dict:
-        """Generate the agency index JSON structure."""
-        index = {}
-
-        for agency_name, agency_data in sorted(self.agencies.items()):
-            # Count actions by type
-            action_counts = {
-                action_type: len(actions)
-                for action_type, actions in agency_data['actions'].items()
-            }
-
-            index[agency_name] = {
-                'bills': sorted(list(agency_data['bills'])),
-                'mention_count': agency_data['mentions'],
-                'total_appropriations': agency_data['total_funding'],
-                'appropriation_details': [
-                    {
-                        'bill': app['bill'],
-                        'amount': app['amount'],
-                        'account': app['account']
-                    }
-                    for app in sorted(agency_data['appropriations'],
-                                     key=lambda x: x['amount'], reverse=True)
-                ],
-                'action_types': action_counts,
-                'programs': sorted(list(agency_data['programs']))[:20],  # Top 20 programs
-                'total_programs': len(agency_data['programs'])
-            }
+        return {
+            'bills': sorted(list(agency_data.bills)),
+            'mention_count': agency_data.mentions,
+            'total_appropriations': agency_data.total_funding,
+            'appropriation_details': [
+                {
+                    'bill': app['bill'],
+                    'amount': app['amount'],
+                    'account': app['account']
+                }
+                for app in sorted(agency_data.appropriations,
+                                 key=lambda x: x['amount'], reverse=True)
+            ],
+            'action_types': action_counts,
+            'programs': sorted(list(agency_data.programs))[:20],  # Top 20 programs
+            'total_programs': len(agency_data.programs)
+        }
 
-        return index
+    def iter_agency_index(self):
+        """Yield (agency name, index entry) in name order, one at a time."""
+        for agency_name in sorted(self.agencies):
+            yield agency_name, self.index_entry(agency_name)
 
-    def generate_agency_network(self) -> Dict:
-        """Generate the agency network JSON structure."""
-        nodes = []
-        edges = []
+    def generate_agency_index(self) -> Dict:
+        """Generate the agency index JSON structure."""
+        return dict(self.iter_agency_index())
 
-        # Create nodes
+    def iter_network_nodes(self):
+        """Yield the agency-network.json nodes one at a time."""
         for agency_name, agency_data in self.agencies.items():
-            nodes.append({
+            yield {
                 'id': agency_name,
                 'label': agency_name,
-                'mentions': agency_data['mentions'],
-                'funding': agency_data['total_funding'],
-                'bills': len(agency_data['bills']),
-                'programs': len(agency_data['programs'])
-            })
+                'mentions': agency_data.mentions,
+                'funding': agency_data.total_funding,
+                'bills': len(agency_data.bills),
+                'programs': len(agency_data.programs)
+            }
 
-        # Create edges
+    def iter_network_edges(self):
+        """Yield the agency-network.json edges one at a time."""
         edge_id = 0
         for agency_name, agency_data in self.agencies.items():
-            for rel_type, related_agencies in agency_data['relationships'].items():
+            for rel_type, related_agencies in agency_data.relationships.items():
                 for related_agency in related_agencies:
-                    edges.append({
+                    yield {
                         'id': edge_id,
                         'source': agency_name,
                         'target': related_agency,
                         'type': rel_type
-                    })
+                    }
                     edge_id += 1
 
+    def count_network_edges(self) -> int:
+        return sum(len(related) for agency_data in self.agencies.values()
+                   for related in agency_data.relationships.values())
+
+    def generate_agency_network(self) -> Dict:
+        """Generate the agency network JSON structure."""
         return {
-            'nodes': nodes,
-            'edges': edges
+            'nodes': list(self.iter_network_nodes()),
+            'edges': list(self.iter_network_edges())
         }
 
+    def write_sqlite(self, db_path: Path) -> None:
+        """
+        Write the results into the extracted_* tables of agency-schema.sql.
+
+        The database may be an existing budget database built from
+        schema.sql. Previous extraction rows are replaced in one
+        transaction using bulk inserts.
+        """
+        schema = (Path(__file__).parent / 'agency-schema.sql').read_text()
+        agency_ids = {name: i for i, name in enumerate(sorted(self.agencies), start=1)}
+
+        agencies, bills, appropriations, actions, programs, relationships = [], [], [], [], [], []
+        for agency_name, agency_id in agency_ids.items():
+            agency_data = self.agencies[agency_name]
+            agencies.append((agency_id, agency_name, agency_data.mentions,
+                             agency_data.total_funding, len(agency_data.programs)))
+            for bill_id in sorted(agency_data.bills):
+                number = re.match(r'\d+', bill_id)
+                bills.append((agency_id, bill_id, int(number.group(0)) if number else None))
+            for app in agency_data.appropriations:
+                appropriations.append((agency_id, app['bill'], app['amount'], app['account']))
+            for action_type, count in agency_data.action_counts.items():
+                actions.append((agency_id, action_type, count))
+            for program in sorted(agency_data.programs):
+                programs.append((agency_id, program))
+            for rel_type, related_agencies in agency_data.relationships.items():
+                for related_agency in sorted(related_agencies):
+                    relationships.append((agency_id, agency_ids[related_agency], rel_type))
+
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.executescript(schema)
+            with conn:
+                for table in ('extracted_relationships', 'extracted_programs', 'extracted_actions',
+                              'extracted_appropriations', 'extracted_agency_bills',
+                              'extracted_agencies'):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany("INSERT INTO extracted_agencies VALUES (?, ?, ?, ?, ?)", agencies)
+                conn.executemany("INSERT INTO extracted_agency_bills VALUES (?, ?, ?)", bills)
+                conn.executemany("INSERT INTO extracted_appropriations VALUES (?, ?, ?, ?)", appropriations)
+                conn.executemany("INSERT INTO extracted_actions VALUES (?, ?, ?)", actions)
+                conn.executemany("INSERT INTO extracted_programs VALUES (?, ?)", programs)
+                conn.executemany("INSERT INTO extracted_relationships VALUES (?, ?, ?)", relationships)
+        finally:
+            conn.close()
+
     def generate_markdown_report(self, index: Dict, network: Dict) -> str:
-        """Generate a comprehensive markdown report."""
+        """
+        Generate a comprehensive markdown report.
+
+        Tables are ranked straight from the AgencyRecords with heapq.nlargest,
+        in index (name) order for ties; index is only used for its size.
+        """
+        records = [(agency, self.agencies[agency]) for agency in sorted(self.agencies)]
+
         report = ["# Washington State Agency and Program Analysis"]
         report.append(f"\n## Overview\n")
         report.append(f"- **Total Agencies Identified**: {len(index)}")
         report.append(f"- **Total Relationships**: {len(network['edges'])}")
 
-        total_funding = sum(data['total_appropriations'] for data in index.values())
+        total_funding = sum(data.total_funding for _, data in records)
         report.append(f"- **Total Appropriations Tracked**: ${total_funding:,.2f}")
 
         # Most frequently mentioned agencies
         report.append(f"\n## Most Frequently Mentioned Agencies\n")
-        sorted_by_mentions = sorted(
-            index.items(),
-            key=lambda x: x[1]['mention_count'],
-            reverse=True
-        )[:20]
+        top_by_mentions = heapq.nlargest(20, records, key=lambda x: x[1].mentions)
 
         report.append("| Rank | Agency | Mentions | Bills | Appropriations |")
         report.append("|------|--------|----------|-------|----------------|")
-        for i, (agency, data) in enumerate(sorted_by_mentions, 1):
-            bills_str = ', '.join(data['bills'][:3])
-            if len(data['bills']) > 3:
-                bills_str += f" (+{len(data['bills'])-3} more)"
+        for i, (agency, data) in enumerate(top_by_mentions, 1):
+            bills_str = ', '.join(sorted(data.bills)[:3])
+            if len(data.bills) > 3:
+                bills_str += f" (+{len(data.bills)-3} more)"
 
-            funding_str = f"${data['total_appropriations']:,.0f}" if data['total_appropriations'] > 0 else "N/A"
-            report.append(f"| {i} | {agency} | {data['mention_count']} | {bills_str} | {funding_str} |")
+            funding_str = f"${data.total_funding:,.0f}" if data.total_funding > 0 else "N/A"
+            report.append(f"| {i} | {agency} | {data.mentions} | {bills_str} | {funding_str} |")
 
         # Agencies with highest appropriations
         report.append(f"\n## Top Funded Agencies\n")
-        sorted_by_funding = sorted(
-            [(a, d) for a, d in index.items() if d['total_appropriations'] > 0],
-            key=lambda x: x[1]['total_appropriations'],
-            reverse=True
-        )[:20]
+        top_by_funding = heapq.nlargest(
+            20,
+            ((a, d) for a, d in records if d.total_funding > 0),
+            key=lambda x: x[1].total_funding
+        )
 
         report.append("| Rank | Agency | Total Appropriations | # of Appropriations |")
         report.append("|------|--------|---------------------|---------------------|")
-        for i, (agency, data) in enumerate(sorted_by_funding, 1):
+        for i, (agency, data) in enumerate(top_by_funding, 1):
             report.append(
-                f"| {i} | {agency} | ${data['total_appropriations']:,.2f} | "
-                f"{len(data['appropriation_details'])} |"
+                f"| {i} | {agency} | ${data.total_funding:,.2f} | "
+                f"{len(data.appropriations)} |"
             )
 
         # New programs being created
         report.append(f"\n## Agencies with Most Programs\n")
-        sorted_by_programs = sorted(
-            [(a, d) for a, d in index.items() if d['total_programs'] > 0],
-            key=lambda x: x[1]['total_programs'],
-            reverse=True
-        )[:20]
+        top_by_programs = heapq.nlargest(
+            20,
+            ((a, d) for a, d in records if d.programs),
+            key=lambda x: len(x[1].programs)
+        )
 
         report.append("| Agency | Program Count | Sample Programs |")
         report.append("|--------|---------------|-----------------|")
-        for agency, data in sorted_by_programs:
-            sample_programs = ', '.join(data['programs'][:3])
-            if data['total_programs'] > 3:
-                sample_programs += f" (+{data['total_programs']-3} more)"
-            report.append(f"| {agency} | {data['total_programs']} | {sample_programs} |")
+        for agency, data in top_by_programs:
+            sample_programs = ', '.join(sorted(data.programs)[:3])
+            if len(data.programs) > 3:
+                sample_programs += f" (+{len(data.programs)-3} more)"
+            report.append(f"| {agency} | {len(data.programs)} | {sample_programs} |")
 
         # Organizational changes
         report.append(f"\n## Organizational Changes and Relationships\n")
 
         # Transfers
         transfers = [
-            (agency, data) for agency, data in index.items()
-            if 'transfer' in data['action_types'] or 'transfer_from' in [
-                rel for rels in self.agencies[agency]['relationships'].values() for rel in rels
+            (agency, data) for agency, data in records
+            if 'transfer' in data.action_counts or 'transfer_from' in [
+                rel for rels in data.relationships.values() for rel in rels
             ]
         ]
 
         if transfers:
             report.append(f"\n### Transfers ({len(transfers)} agencies involved)\n")
-            for agency, data in sorted(transfers, key=lambda x: x[1]['action_types'].get('transfer', 0), reverse=True)[:10]:
-                transfer_count = data['action_types'].get('transfer', 0)
+            for agency, data in heapq.nlargest(10, transfers, key=lambda x: x[1].action_counts.get('transfer', 0)):
+                transfer_count = data.action_counts.get('transfer', 0)
                 if transfer_count > 0:
                     report.append(f"- **{agency}**: {transfer_count} transfer actions")
 
@@ -476,8 +1342,8 @@ class AgencyExtractor:
         # Action type summary
         report.append(f"\n## Action Type Summary\n")
         all_actions = defaultdict(int)
-        for agency_data in index.values():
-            for action_type, count in agency_data['action_types'].items():
+        for _, agency_data in records:
+            for action_type, count in agency_data.action_counts.items():
                 all_actions[action_type] += count
 
         report.append("| Action Type | Total Count |")
@@ -488,43 +1354,465 @@ class AgencyExtractor:
         return '\n'.join(report)
 
 
+class AgencyIndexView(Mapping):
+    """
+    Read-only agency index that builds each entry on access.
+
+    Stands in for the generate_agency_index() dict (e.g. for the JSON
+    writer) without holding every entry in memory at once.
+    """
+
+    def __init__(self, extractor: AgencyExtractor):
+        self.extractor = extractor
+
+    def __getitem__(self, agency_name: str) -> Dict:
+        if agency_name not in self.extractor.agencies:
+            raise KeyError(agency_name)
+        return self.extractor.index_entry(agency_name)
+
+    def __iter__(self):
+        return iter(sorted(self.extractor.agencies))
+
+    def __len__(self) -> int:
+        return len(self.extractor.agencies)
+
+
+class LazyList:
+    """Sized iterable that re-runs a generator function on each iteration."""
+
+    def __init__(self, generate, length: int):
+        self.generate = generate
+        self.length = length
+
+    def __iter__(self):
+        return self.generate()
+
+    def __len__(self) -> int:
+        return self.length
+
+
+def write_json_stream(f, value, compact: bool = False, default=None) -> None:
+    """
+    Write value as JSON, streaming the parts that are generators.
+
+    A top-level mapping (such as AgencyIndexView) is written key by key.
+    Generators (and LazyList) are written as JSON arrays one element at a
+    time, so only the current element is ever encoded in memory. Other
+    values are encoded whole. The pretty output is byte-identical to
+    json.dump(..., indent=2) of the materialized value; compact mode drops
+    all optional whitespace.
+    """
+    if compact:
+        encoder = json.JSONEncoder(separators=(',', ':'), default=default)
+        key_separator = ':'
+    else:
+        encoder = json.JSONEncoder(indent=2, default=default)
+        key_separator = ': '
+
+    def write(value, level: int) -> None:
+        newline = '' if compact else '\n' + '  ' * level
+        if level == 0 and isinstance(value, Mapping):
+            pairs = iter(value.items())
+            opening, closing = '{', '}'
+        elif isinstance(value, LazyList) or inspect.isgenerator(value):
+            pairs = ((None, item) for item in value)
+            opening, closing = '[', ']'
+        else:
+            # Re-indent a nested value to its depth (strings never contain
+            # raw newlines in JSON)
+            text = encoder.encode(value)
+            f.write(text if compact else text.replace('\n', newline))
+            return
+
+        f.write(opening)
+        inner = '' if compact else newline + '  '
+        first = True
+        for key, item in pairs:
+            f.write(inner if first else ',' + inner)
+            if key is not None:
+                f.write(encoder.encode(key) + key_separator)
+            write(item, level + 1)
+            first = False
+        if not first:
+            f.write(newline)
+        f.write(closing)
+
+    write(value, 0)
+
+
+def write_ndjson(f, records, default=None) -> None:
+    """Write one compact JSON document per line."""
+    for record in records:
+        f.write(json.dumps(record, separators=(',', ':'), default=default))
+        f.write('\n')
+
+
+class ExtractionCache:
+    """
+    On-disk cache of per-bill extraction results.
+
+    Each bill's partial results (agency name -> AgencyRecord) are pickled
+    under a key made of the SHA-256 of the XML file, its bill id (which the
+    results record), EXTRACTOR_VERSION and the extraction options, so
+    unchanged bills are not parsed again on the next run.
+    evict() removes the least recently used entries once the cache grows
+    past max_bytes.
+    """
+
+    DIRNAME = ".extract-cache"
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, xml_file: Path, stream: bool = False, context_sample: int = 0,
+            bill_id: Optional[str] = None) -> str:
+        """Cache key for the current contents of xml_file (bill_id defaults to its stem)."""
+        mode = 'stream' if stream else 'tree'
+        if context_sample:
+            mode += f"-sample{context_sample}"
+        # Identical files under different names are different bills
+        return f"{file_sha256(xml_file)}-{bill_id or xml_file.stem}-v{EXTRACTOR_VERSION}-{mode}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[Dict[str, AgencyRecord]]:
+        """Return the cached results for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                agencies = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # unpickling a damaged file can raise almost anything
+            print(f"  Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return agencies
+
+    def put(self, key: str, agencies: Dict[str, AgencyRecord]) -> None:
+        """Store results for key."""
+        path = self._path(key)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(agencies, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> None:
+        """Remove least recently used entries until within max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob('*.pickle'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def bill_id_for(xml_file: Path, bills_dir: Path) -> str:
+    """
+    Bill id of an XML file found under bills_dir: its stem, qualified with
+    the biennium for bills mirrored by download_bills.py, whose numbers
+    recur every biennium (2023-24/Xml/Bills/Senate Bills/5950-S.xml is
+    "5950-S (2023-24)").
+    """
+    try:
+        parts = xml_file.relative_to(bills_dir).parts
+    except ValueError:
+        return xml_file.stem
+    if len(parts) > 1 and BIENNIUM_PATTERN.fullmatch(parts[0]):
+        return f"{xml_file.stem} ({parts[0]})"
+    return xml_file.stem
+
+
+def extract_file(xml_file: Path, stream: bool = False, context_sample: int = 0,
+                 snapshot: bool = True, profile: bool = False, bill_id: Optional[str] = None
+                 ) -> Tuple[Dict[str, AgencyRecord], Dict[Tuple[str, str], Dict[str, float]]]:
+    """
+    Extract a single bill (recorded as bill_id, default: the file stem) with a
+    fresh extractor and return its partial results and, with profile, its
+    PhaseProfiler records (otherwise empty).
+    With snapshot, the bill is read from its BillSnapshot instead of the XML,
+    except with stream: a snapshot holds the whole bill text, so streaming
+    always parses the XML incrementally to keep memory bounded.
+    """
+    bill_id = bill_id or xml_file.stem
+    profiler = PhaseProfiler(enabled=profile)
+    extractor = AgencyExtractor(stream=stream, context_sample=context_sample, profiler=profiler)
+    if snapshot and not stream:
+        with profiler.phase('parse', bill_id):
+            bill = BillSnapshot.load(xml_file)
+        if bill is not None:
+            extractor.extract_agencies_from_snapshot(bill, bill_id)
+    else:
+        extractor.extract_agencies_from_xml(xml_file, bill_id)
+    return dict(extractor.agencies), profiler.records
+
+
+def build_parser(bills_dir: Optional[Path] = None, **kwargs) -> argparse.ArgumentParser:
+    """
+    Command-line options of the extraction (also used by pipeline.py, which
+    passes its own default bills_dir).
+    """
+    parser = argparse.ArgumentParser(
+        description='Extract agencies, programs and relationships from WA bill XML',
+        **kwargs
+    )
+    parser.add_argument(
+        '--bills-dir',
+        help='Directory searched recursively for bill XML files (default: '
+             + (str(bills_dir) if bills_dir else 'the repository\'s bills/') + ')',
+        type=Path,
+        default=bills_dir or DEFAULT_BILLS_DIR
+    )
+    parser.add_argument(
+        '--workers',
+        help='Number of worker processes for per-bill extraction (1 = serial)',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--stream',
+        help='Parse and analyze bills one BillSection at a time (bounded memory; '
+             'pre-parsed snapshots are not used)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--context-sample',
+        help='Keep at most N transfer/collaboration/oversight contexts per agency '
+             'for relationship detection (reservoir sample; 0 = keep all)',
+        type=int,
+        default=0
+    )
+    parser.add_argument(
+        '--no-snapshot',
+        help='Parse the XML of every extracted bill instead of using pre-parsed '
+             'snapshots stored next to it',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--json-format',
+        help='Layout of the agency index and network files: indented JSON, '
+             'JSON without whitespace, or newline-delimited JSON (.ndjson)',
+        choices=['pretty', 'compact', 'ndjson'],
+        default='pretty'
+    )
+    parser.add_argument(
+        '--sqlite',
+        help='Also write the results to this SQLite database (see agency-schema.sql)',
+        type=Path
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Directory for cached per-bill results',
+        default=ExtractionCache.DIRNAME
+    )
+    parser.add_argument(
+        '--cache-size',
+        help='Maximum size of the per-bill result cache in MB',
+        type=int,
+        default=256
+    )
+    parser.add_argument(
+        '--no-cache',
+        help='Re-extract every bill and do not update the cache',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--profile',
+        help='Record wall time, CPU time, matches and allocations per phase and bill, '
+             'print a summary and write the timing report to this JSON file',
+        type=Path
+    )
+    parser.add_argument(
+        '--cprofile',
+        help='Run under cProfile and write the stats to this file (pstats format)',
+        type=Path
+    )
+    parser.add_argument(
+        '--tracemalloc',
+        help='Trace allocations with tracemalloc and dump a snapshot to this file; '
+             'also adds traced bytes to the --profile report',
+        type=Path
+    )
+    return parser
+
+
 def main():
-    extractor = AgencyExtractor()
+    args = build_parser().parse_args()
+    run_profiled(args, extract_all, subprocesses=args.workers > 1)
+
+
+def run_profiled(args: argparse.Namespace, run, subprocesses: bool = False) -> None:
+    """
+    Call run(args, profiler) under the profilers selected by --profile,
+    --cprofile and --tracemalloc, then write their reports. run returns
+    its tracemalloc snapshot (see extract_all).
+    """
+    if (args.cprofile or args.tracemalloc) and subprocesses:
+        print("Note: --cprofile and --tracemalloc only cover the main process; "
+              "use --workers 1 to include per-bill extraction")
+    profiler = PhaseProfiler(enabled=args.profile is not None)
+    if args.tracemalloc:
+        tracemalloc.start()
+    if args.cprofile:
+        cprofiler = cProfile.Profile()
+        snapshot = cprofiler.runcall(run, args, profiler)
+        cprofiler.dump_stats(args.cprofile)
+        print(f"\n✓ Wrote cProfile stats to {args.cprofile}")
+        pstats.Stats(cprofiler).sort_stats('cumulative').print_stats(15)
+    else:
+        snapshot = run(args, profiler)
+
+    if args.tracemalloc:
+        tracemalloc.stop()
+        snapshot.dump(str(args.tracemalloc))
+        print(f"\n✓ Wrote tracemalloc snapshot to {args.tracemalloc}")
+        for stat in snapshot.statistics('lineno')[:10]:
+            print(f"  {stat}")
+
+    if args.profile:
+        profiler.print_summary()
+        with open(args.profile, 'w') as f:
+            json.dump(profiler.report(), f, indent=2)
+        print(f"✓ Wrote timing report to {args.profile}")
+
+
+def extract_all(args: argparse.Namespace, profiler: PhaseProfiler,
+                ready: Optional[Dict[Path, Dict[str, AgencyRecord]]] = None
+                ) -> Optional[tracemalloc.Snapshot]:
+    """
+    Run the extraction and write its outputs, as configured by main's arguments.
+    ready maps resolved XML paths to results extracted earlier in this run
+    (see pipeline.py); those bills are cached but not extracted again.
+    While tracemalloc is tracing, returns a snapshot taken once all results
+    and relationships are in memory.
+    """
+    ready = ready or {}
+    extractor = AgencyExtractor(stream=args.stream, context_sample=args.context_sample,
+                                profiler=profiler)
 
     # Find all XML files
-    xml_files = list(Path('.').glob('*.xml'))
-    print(f"Found {len(xml_files)} XML bill files")
+    xml_files = sorted(args.bills_dir.rglob('*.xml'))
+    bill_ids = [bill_id_for(xml_file, args.bills_dir) for xml_file in xml_files]
+    print(f"Found {len(xml_files)} XML bill files under {args.bills_dir}")
+
+    # Reuse cached results for bills that have not changed
+    cache = None
+    keys: List[Optional[str]] = [None] * len(xml_files)
+    cached = [ready.get(xml_file.resolve()) for xml_file in xml_files]
+    extracted_before = sum(partial is not None for partial in cached)
+    if not args.no_cache:
+        cache = ExtractionCache(Path(args.cache_dir), args.cache_size * 1024 * 1024)
+        with profiler.phase('cache'):
+            for i, xml_file in enumerate(xml_files):
+                keys[i] = cache.key(xml_file, args.stream, args.context_sample, bill_ids[i])
+                if cached[i] is None:
+                    cached[i] = cache.get(keys[i])
+                else:
+                    cache.put(keys[i], cached[i])
+        hits = sum(partial is not None for partial in cached) - extracted_before
+        print(f"Using cached results for {hits} bills, "
+              f"extracting {len(xml_files) - hits - extracted_before}")
 
     # Extract from each file
-    for xml_file in xml_files:
-        extractor.extract_agencies_from_xml(xml_file)
+    pending_files = [xml_file for xml_file, partial in zip(xml_files, cached) if partial is None]
+    pending_ids = [bill_id for bill_id, partial in zip(bill_ids, cached) if partial is None]
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        options = (repeat(args.stream), repeat(args.context_sample),
+                   repeat(not args.no_snapshot), repeat(profiler.enabled))
+        if pool:
+            extracted = pool.map(extract_file, pending_files, *options, pending_ids)
+        else:
+            extracted = map(extract_file, pending_files, *options, pending_ids)
+
+        # Merge in file order so the output matches a serial run exactly
+        for key, partial in zip(keys, cached):
+            if partial is None:
+                partial, records = next(extracted)
+                profiler.merge(records)
+                if cache:
+                    with profiler.phase('cache'):
+                        cache.put(key, partial)
+            with profiler.phase('merge'):
+                extractor.merge(partial)
+    finally:
+        if pool:
+            pool.shutdown()
+    if cache:
+        with profiler.phase('cache'):
+            cache.evict()
 
     # Extract relationships
     print("\nExtracting relationships...")
-    extractor.extract_relationships()
+    with profiler.phase('relationships'):
+        extractor.extract_relationships()
+    snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
 
     # Generate outputs
     print("\nGenerating outputs...")
 
-    # Agency index
-    agency_index = extractor.generate_agency_index()
-    with open('agency-index.json', 'w') as f:
-        json.dump(agency_index, f, indent=2, default=lambda x: list(x) if isinstance(x, set) else x)
-    print(f"✓ Generated agency-index.json ({len(agency_index)} agencies)")
-
-    # Agency network
-    agency_network = extractor.generate_agency_network()
-    with open('agency-network.json', 'w') as f:
-        json.dump(agency_network, f, indent=2)
-    print(f"✓ Generated agency-network.json ({len(agency_network['nodes'])} nodes, {len(agency_network['edges'])} edges)")
-
-    # Markdown report
-    report = extractor.generate_markdown_report(agency_index, agency_network)
-    with open('agency-report.md', 'w') as f:
-        f.write(report)
-    print(f"✓ Generated agency-report.md")
+    with profiler.phase('outputs'):
+        # Index entries and edges are built and written one at a time
+        agency_index = AgencyIndexView(extractor)
+        agency_network = {
+            'nodes': LazyList(extractor.iter_network_nodes, len(extractor.agencies)),
+            'edges': LazyList(extractor.iter_network_edges, extractor.count_network_edges())
+        }
+        json_default = lambda x: list(x) if isinstance(x, set) else x
+
+        if args.json_format == 'ndjson':
+            # Agency index: one {"agency": ..., ...} object per line
+            with open('agency-index.ndjson', 'w') as f:
+                write_ndjson(f, ({'agency': agency_name, **entry}
+                                 for agency_name, entry in extractor.iter_agency_index()),
+                             default=json_default)
+            print(f"✓ Generated agency-index.ndjson ({len(agency_index)} agencies)")
+
+            # Agency network: node lines, then edge lines
+            with open('agency-network.ndjson', 'w') as f:
+                write_ndjson(f, ({'kind': 'node', **node} for node in extractor.iter_network_nodes()))
+                write_ndjson(f, ({'kind': 'edge', **edge} for edge in extractor.iter_network_edges()))
+            print(f"✓ Generated agency-network.ndjson ({len(agency_network['nodes'])} nodes, {len(agency_network['edges'])} edges)")
+        else:
+            compact = args.json_format == 'compact'
+
+            # Agency index
+            with open('agency-index.json', 'w') as f:
+                write_json_stream(f, agency_index, compact, json_default)
+            print(f"✓ Generated agency-index.json ({len(agency_index)} agencies)")
+
+            # Agency network
+            with open('agency-network.json', 'w') as f:
+                write_json_stream(f, agency_network, compact)
+            print(f"✓ Generated agency-network.json ({len(agency_network['nodes'])} nodes, {len(agency_network['edges'])} edges)")
+
+        # Markdown report
+        report = extractor.generate_markdown_report(agency_index, agency_network)
+        with open('agency-report.md', 'w') as f:
+            f.write(report)
+        print(f"✓ Generated agency-report.md")
+
+    # SQLite tables
+    if args.sqlite:
+        with profiler.phase('sqlite'):
+            extractor.write_sqlite(args.sqlite)
+        print(f"✓ Wrote extraction results to {args.sqlite}")
 
     print("\n✓ Extraction complete!")
+    return snapshot
 
 
 if __name__ == '__main__':
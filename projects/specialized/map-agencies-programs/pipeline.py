@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Download WA bills and extract agencies from them in one overlapped run.
+
+WABillDownloader (map-wa-legal-site/download_bills.py) saves bills into
+--bills-dir on its own threads and hands every new or changed XML file to
+a bounded queue. Worker processes extract those bills while downloads go
+on; when the queue is full, downloads wait for extraction to catch up.
+Once the last download finishes, the agency outputs are refreshed over all
+bills under --bills-dir: bills extracted during the download are used as
+they are, and skipped or unchanged bills come from the per-bill result
+cache rather than being extracted again.
+
+--bills-dir defaults to the downloader's archive, map-wa-legal-site/bills,
+never the repository's curated bills/: the same bill in both layouts would
+be counted twice. Downloaded bills are identified by number and biennium
+(see bill_id_for), as numbers recur every biennium.
+
+Takes every extract_agencies.py option (--workers is the number of
+extraction processes, at least one) plus the download options below.
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from extract_agencies import (DEFAULT_BILLS_DIR, AgencyRecord, PhaseProfiler, bill_id_for,
+                              build_parser, extract_all, extract_file, run_profiled)
+
+# download_bills.py lives in the sibling map-wa-legal-site project
+DOWNLOADER_DIR = Path(__file__).resolve().parents[1] / 'map-wa-legal-site'
+sys.path.insert(0, str(DOWNLOADER_DIR))
+from download_bills import AsyncWABillDownloader, WABillDownloader  # noqa: E402
+
+
+def download(downloader: WABillDownloader, args: argparse.Namespace) -> None:
+    """Run the range or config download selected by the arguments."""
+    if args.biennium and args.chamber and args.start and args.end:
+        downloader.download_range(args.biennium, args.chamber, args.start, args.end,
+                                  args.format, discover=args.discover)
+    else:
+        downloader.download_from_config(args.config)
+
+
+def run_pipeline(args: argparse.Namespace, profiler: PhaseProfiler):
+    """Download and extract concurrently, then refresh the outputs with extract_all."""
+    pending: queue.Queue = queue.Queue(maxsize=args.queue_size)
+    stopped = threading.Event()
+
+    def hand_off(item: Optional[Path]) -> None:
+        """Queue an XML file (None once downloads are done) for extraction."""
+        # Blocks the download while the queue is full, unless extraction stopped
+        while not stopped.is_set():
+            try:
+                pending.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def on_saved(path: Path) -> None:
+        if path.suffix == '.xml':
+            hand_off(path)
+
+    downloader_class = AsyncWABillDownloader if args.backend == 'async' else WABillDownloader
+    downloader = downloader_class(
+        output_dir=str(args.bills_dir),
+        delay=args.delay,
+        workers=args.download_workers,
+        sync=args.sync,
+        journal_path=args.journal,
+        resume=args.resume,
+        on_saved=on_saved
+    )
+    errors: List[BaseException] = []
+
+    def run_downloads() -> None:
+        try:
+            download(downloader, args)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            hand_off(None)
+
+    # Results of the bills extracted while downloading, by resolved path
+    ready: Dict[Path, Dict[str, AgencyRecord]] = {}
+    workers = max(1, args.workers)
+    in_flight = {}
+
+    def collect(futures) -> None:
+        """Take the results of finished extractions; raises the first error."""
+        for future in futures:
+            path = in_flight.pop(future)
+            partial, records = future.result()
+            profiler.merge(records)
+            ready[path.resolve()] = partial
+
+    thread = threading.Thread(target=run_downloads, name='download')
+    pool = ProcessPoolExecutor(max_workers=workers)
+    thread.start()
+    try:
+        with profiler.phase('download'):
+            while True:
+                try:
+                    path = pending.get(timeout=1)
+                except queue.Empty:
+                    # Notice failed extractions while downloads are slow
+                    collect([future for future in in_flight if future.done()])
+                    continue
+                if path is None:
+                    break
+                # One bill per process in flight; the queue holds the rest
+                if len(in_flight) >= workers:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                future = pool.submit(extract_file, path, args.stream, args.context_sample,
+                                     not args.no_snapshot, profiler.enabled,
+                                     bill_id_for(path, args.bills_dir))
+                in_flight[future] = path
+            for future in as_completed(list(in_flight)):
+                collect([future])
+    finally:
+        # On an error, stop promptly: no new requests or extractions, only
+        # the downloads already in progress finish
+        stopped.set()
+        downloader.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+        thread.join()
+        downloader.close()
+    if errors:
+        raise errors[0]
+
+    print(f"\n⚙️  Extracted {len(ready)} new or changed XML bills while downloading; "
+          f"refreshing agency outputs\n")
+    return extract_all(args, profiler, ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Download WA bills and extract agencies as they arrive',
+        parents=[build_parser(DOWNLOADER_DIR / 'bills', add_help=False)]
+    )
+    parser.add_argument(
+        '--config',
+        help='JSON config file with bill specifications (default: map-wa-legal-site/bills_config.json)',
+        default=str(DOWNLOADER_DIR / 'bills_config.json')
+    )
+    parser.add_argument(
+        '--biennium',
+        help='Biennium (e.g., 2023-24) for range download'
+    )
+    parser.add_argument(
+        '--chamber',
+        help='Chamber (House or Senate) for range download',
+        choices=['House', 'Senate']
+    )
+    parser.add_argument(
+        '--start',
+        help='Starting bill number for range download',
+        type=int
+    )
+    parser.add_argument(
+        '--end',
+        help='Ending bill number for range download',
+        type=int
+    )
+    parser.add_argument(
+        '--format',
+        help='Format type of a range download (only XML bills are extracted)',
+        choices=list(WABillDownloader.FORMAT_EXTENSIONS),
+        default='Xml'
+    )
+    parser.add_argument(
+        '--discover',
+        help='Range mode: request only bills that exist (see download_bills.py --discover)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--delay',
+        help='Delay between requests in seconds',
+        type=float,
+        default=1.0
+    )
+    parser.add_argument(
+        '--download-workers',
+        help='Number of concurrent downloads (requests still share the --delay rate budget)',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--backend',
+        help='HTTP backend: requests on worker threads, or asyncio/aiohttp',
+        choices=['threads', 'async'],
+        default='threads'
+    )
+    parser.add_argument(
+        '--sync',
+        help='Re-check existing files with conditional GETs and refresh changed ones',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--journal',
+        help='SQLite journal of download outcomes '
+             '(default: <bills-dir>/.download-journal.sqlite3, "" to disable)'
+    )
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument(
+        '--resume',
+        help="Continue this job's last run, skipping URLs it already settled",
+        action='store_const', const='resume', dest='resume'
+    )
+    resume_group.add_argument(
+        '--retry-failed',
+        help="Continue this job's last run, retrying only URLs that failed",
+        action='store_const', const='failed', dest='resume'
+    )
+    parser.add_argument(
+        '--queue-size',
+        help='Saved XML files waiting for extraction before downloads pause',
+        type=int,
+        default=8
+    )
+    args = parser.parse_args()
+
+    if args.bills_dir.resolve() == DEFAULT_BILLS_DIR:
+        parser.error("--bills-dir must not be the repository's curated bills/, "
+                     "whose bills would also be extracted from the downloaded copies")
+
+    ranged = args.biennium and args.chamber and args.start and args.end
+    if not ranged and not os.path.exists(args.config):
+        print(f"❌ Config file not found: {args.config}")
+        sys.exit(1)
+
+    run_profiled(args, run_pipeline, subprocesses=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark WABillDownloader against a local stub HTTP server.
+
+Serves fake bills with a fixed per-request latency so the serial and
+concurrent download paths can be compared without touching
+lawfilesext.leg.wa.gov.
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from download_bills import AsyncWABillDownloader, WABillDownloader
+
+
+class StubBillHandler(BaseHTTPRequestHandler):
+    """Answers every odd bill number with 404 and even ones with a body."""
+
+    latency = 0.05
+    body = b"%PDF-1.4\n" + b"0" * 64 * 1024
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        number = self.path.rsplit('/', 1)[-1].split('.')[0]
+        if number.isdigit() and int(number) % 2:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(base_url: str, backend: str, workers: int, delay: float,
+        count: int) -> dict:
+    """Download ``count`` stub bills and return timing and stats."""
+    downloader_class = AsyncWABillDownloader if backend == 'async' else WABillDownloader
+    with tempfile.TemporaryDirectory() as output_dir:
+        downloader = downloader_class(output_dir=output_dir, delay=delay,
+                                      workers=workers)
+        downloader.BASE_URL = base_url
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                downloader.download_range('2023-24', 'House', 1000, 1000 + count - 1)
+        finally:
+            downloader.close()
+        elapsed = time.perf_counter() - started
+    return {'elapsed': elapsed, **downloader.stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bill downloads')
+    parser.add_argument('--count', type=int, default=200,
+                        help='Number of bill numbers to request')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Stub server latency per request in seconds')
+    parser.add_argument('--delay', type=float, default=0.005,
+                        help='Downloader --delay (rate budget) in seconds')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16],
+                        help='Worker counts to compare')
+    parser.add_argument('--backend', nargs='+', default=['threads'],
+                        choices=['threads', 'async'],
+                        help='HTTP backends to compare')
+    args = parser.parse_args()
+
+    StubBillHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubBillHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{args.count} requests, {args.latency * 1000:.0f} ms latency, "
+          f"delay {args.delay}s")
+    print(f"{'backend':>8} {'workers':>8} {'seconds':>9} {'req/s':>8} "
+          f"{'downloaded':>11} {'failed':>7}")
+    try:
+        for backend in args.backend:
+            for workers in args.workers:
+                result = run(base_url, backend, workers, args.delay, args.count)
+                print(f"{backend:>8} {workers:>8} {result['elapsed']:>9.2f} "
+                      f"{args.count / result['elapsed']:>8.1f} "
+                      f"{result['downloaded']:>11} {result['failed']:>7}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,57 +7,1067 @@ structure that mirrors the website organization.
 """
 
 import os
+import re
 import sys
 import json
 import time
+import asyncio
+import email.utils
+import shutil
+import sqlite3
+import hashlib
 import argparse
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
-from urllib.parse import quote
-from typing import List, Dict, Optional
+from urllib.parse import quote, unquote, urlparse
+from typing import Any, BinaryIO, Callable, List, Dict, Mapping, Optional, Tuple
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from urllib3.util.retry import Retry
 
+try:
+    import aiohttp
+except ImportError:  # Only needed for --backend async
+    aiohttp = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace requests against one host."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second (0 disables limiting)
+            burst: Maximum number of tokens that can accumulate
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available, else return seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until one is available.
+
+        Returns:
+            Seconds spent waiting for the token
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self) -> float:
+        """Like acquire(), but yields to the event loop while waiting."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+def format_ranges(numbers: List[int]) -> str:
+    """Format sorted numbers as compact ranges, e.g. "1021-1049, 1051"."""
+    ranges = []
+    for number in numbers:
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ', '.join(str(first) if first == last else f"{first}-{last}"
+                     for first, last in ranges)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (q in 0-100), or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+class MetricsRecorder:
+    """
+    Collects one metrics record per HTTP request.
+
+    Each record holds the URL, status code, retries, bytes received and
+    timings in seconds: ``rate_wait`` (token-bucket sleep), ``dns`` and
+    ``connect`` (None when a pooled connection was reused, and ``dns`` is
+    only measured by the async backend; on the threads backend
+    ``connect`` includes name resolution), ``ttfb`` (request start to
+    response headers) and ``total``. Records are optionally streamed to a
+    JSON lines file and summarized as percentiles at the end of a run.
+    """
+
+    TIMINGS = ('rate_wait', 'dns', 'connect', 'ttfb', 'total')
+
+    def __init__(self, path: Optional[str] = None):
+        self.records: List[Dict] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.file = open(path, 'a') if path else None
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def begin(self, url: str) -> Dict:
+        """Start a record and make it current for the calling thread."""
+        record = {
+            'url': url, 'status': None, 'retries': 0, 'bytes': 0,
+            'rate_wait': 0.0, 'dns': None, 'connect': None,
+            'ttfb': None, 'total': None, 'error': None,
+            'started': time.time(),
+        }
+        self.local.current = record
+        return record
+
+    def note_connect(self, seconds: float) -> None:
+        """Add connection setup time to the calling thread's record."""
+        record = getattr(self.local, 'current', None)
+        if record is not None:
+            record['connect'] = (record['connect'] or 0.0) + seconds
+
+    def finish(self, record: Dict, request_started: float) -> None:
+        """Close a record started at ``request_started`` (perf_counter)."""
+        now = time.perf_counter()
+        record['total'] = now - request_started
+        self.local.current = None
+        with self.lock:
+            if self.first_start is None:
+                self.first_start = request_started - record['rate_wait']
+            self.last_end = now
+            self.records.append(record)
+            if self.file is not None:
+                self.file.write(json.dumps(record) + '\n')
+                self.file.flush()
+
+    def summary(self) -> Dict:
+        """Percentiles per timing plus totals and throughput."""
+        with self.lock:
+            records = list(self.records)
+            wall = (self.last_end - self.first_start) if records else 0.0
+        total_bytes = sum(r['bytes'] for r in records)
+        result = {
+            'requests': len(records),
+            'bytes': total_bytes,
+            'retries': sum(r['retries'] for r in records),
+            'seconds': wall,
+            'mb_per_s': total_bytes / 1_000_000 / wall if wall > 0 else 0.0,
+            'timings': {},
+        }
+        for name in self.TIMINGS:
+            values = [r[name] for r in records if r[name] is not None]
+            result['timings'][name] = {
+                f"p{q}": percentile(values, q) for q in (50, 95, 99)
+            }
+        return result
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """urllib3 connection that reports its setup time to a MetricsRecorder."""
+
+    recorder: Optional[MetricsRecorder] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            if self.recorder is not None:
+                self.recorder.note_connect(time.perf_counter() - started)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS variant of TimedHTTPConnection (includes the TLS handshake)."""
+
+    recorder: Optional[MetricsRecorder] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            if self.recorder is not None:
+                self.recorder.note_connect(time.perf_counter() - started)
+
+
+class ThrottleRetry(Retry):
+    """
+    Retry that sleeps for Retry-After only on RETRY_AFTER_STATUS_CODES
+    (413/429/503); other retried statuses use exponential backoff.
+    """
+
+    def get_retry_after(self, response) -> Optional[float]:
+        if response.status not in self.RETRY_AFTER_STATUS_CODES:
+            return None
+        return super().get_retry_after(response)
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools open connections that record setup time."""
+
+    def __init__(self, recorder: MetricsRecorder, **kwargs):
+        self.recorder = recorder
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        http_conn = type('HTTPConnection', (TimedHTTPConnection,),
+                         {'recorder': self.recorder})
+        https_conn = type('HTTPSConnection', (TimedHTTPSConnection,),
+                          {'recorder': self.recorder})
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('HTTPConnectionPool', (HTTPConnectionPool,),
+                         {'ConnectionCls': http_conn}),
+            'https': type('HTTPSConnectionPool', (HTTPSConnectionPool,),
+                          {'ConnectionCls': https_conn}),
+        }
+
+
+class DownloadManifest:
+    """
+    Sidecar record of what was fetched for each output file.
+
+    Stored as JSON next to the downloaded tree and keyed by the output
+    path relative to the output directory. Each entry keeps the ETag,
+    Last-Modified, size and SHA-256 of the saved file so a later sync
+    can issue conditional requests.
+    """
+
+    FILENAME = ".download-manifest.json"
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.path = output_dir / self.FILENAME
+        self.entries: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f).get('files', {})
+
+    def _key(self, output_path: Path) -> str:
+        try:
+            return output_path.relative_to(self.output_dir).as_posix()
+        except ValueError:
+            return output_path.as_posix()
+
+    def get(self, output_path: Path) -> Optional[Dict]:
+        """Return the manifest entry for a file, if any."""
+        with self.lock:
+            return self.entries.get(self._key(output_path))
+
+    def update(self, output_path: Path, url: str, headers: Mapping[str, str],
+               sha256: Optional[str], size: int) -> None:
+        """Record the validators and digest of a freshly saved file."""
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'size': size,
+            'sha256': sha256,
+        }
+        with self.lock:
+            self.entries[self._key(output_path)] = entry
+
+    def save(self) -> None:
+        """Write the manifest to disk (atomically replacing the old one)."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with self.lock:
+            data = {'files': dict(sorted(self.entries.items()))}
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class NegativeCache:
+    """
+    Persistent record of URLs that recently returned 404.
+
+    Lets repeated --discover probes skip bill numbers that are known not to
+    exist until the entry is older than ``ttl`` seconds.
+    """
+
+    FILENAME = ".negative-cache.json"
+
+    def __init__(self, output_dir: Path, ttl: float):
+        self.output_dir = output_dir
+        self.path = output_dir / self.FILENAME
+        self.ttl = ttl
+        self.entries: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+
+    def is_missing(self, url: str) -> bool:
+        """True if the URL returned 404 within the TTL."""
+        with self.lock:
+            seen = self.entries.get(url)
+        return seen is not None and time.time() - seen < self.ttl
+
+    def add(self, url: str) -> None:
+        with self.lock:
+            self.entries[url] = time.time()
+
+    def discard(self, url: str) -> None:
+        with self.lock:
+            self.entries.pop(url, None)
+
+    def save(self) -> None:
+        """Write fresh entries to disk, dropping expired ones."""
+        now = time.time()
+        with self.lock:
+            data = {url: seen for url, seen in sorted(self.entries.items())
+                    if now - seen < self.ttl}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class DownloadJournal:
+    """
+    Append-only SQLite ledger of download outcomes.
+
+    Every attempt is committed as it happens, so a crashed run leaves an
+    accurate record. Records are grouped into runs of a named job (a
+    config file or a range); a resumed run continues the job's latest run
+    instead of starting a new one, so the ``latest`` view always holds
+    the cumulative state of the job.
+    """
+
+    FILENAME = ".download-journal.sqlite3"
+    # Outcomes that need no further work when resuming
+    SETTLED = {'downloaded', 'unchanged', 'skipped', 'not_found'}
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.run_id: Optional[int] = None
+        self.latest: Dict[str, str] = {}
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY,
+                job TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY,
+                run_id INTEGER NOT NULL REFERENCES runs(run_id),
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                detail TEXT,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_run_url ON records(run_id, url);
+            CREATE VIEW IF NOT EXISTS latest AS
+                SELECT r.run_id, r.url, r.status, r.detail, r.recorded_at
+                FROM records r
+                JOIN (SELECT MAX(id) AS id FROM records GROUP BY run_id, url) m
+                  ON r.id = m.id;
+        """)
+        self.conn.commit()
+
+    def start_run(self, job: str, resume: bool = False) -> int:
+        """
+        Begin (or, with ``resume``, continue) a run of ``job``.
+
+        Returns:
+            The run id records are written to
+        """
+        with self.lock:
+            row = None
+            if resume:
+                row = self.conn.execute(
+                    "SELECT run_id FROM runs WHERE job = ? ORDER BY run_id DESC LIMIT 1",
+                    (job,)
+                ).fetchone()
+            if row:
+                self.run_id = row[0]
+                self.conn.execute("UPDATE runs SET finished_at = NULL WHERE run_id = ?",
+                                  (self.run_id,))
+            else:
+                self.run_id = self.conn.execute(
+                    "INSERT INTO runs (job, started_at) VALUES (?, ?)",
+                    (job, time.time())
+                ).lastrowid
+            self.conn.commit()
+            self.latest = dict(self.conn.execute(
+                "SELECT url, status FROM latest WHERE run_id = ?", (self.run_id,)
+            ))
+        return self.run_id
+
+    def status(self, url: str) -> Optional[str]:
+        """Latest recorded outcome for a URL in the current run."""
+        with self.lock:
+            return self.latest.get(url)
+
+    def record(self, url: str, status: str, detail: Optional[str] = None) -> None:
+        """Append an outcome and commit it immediately."""
+        with self.lock:
+            if self.run_id is None:
+                return
+            self.conn.execute(
+                "INSERT INTO records (run_id, url, status, detail, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, url, status, detail, time.time())
+            )
+            self.conn.commit()
+            self.latest[url] = status
+
+    def summary(self) -> Dict[str, int]:
+        """Count URLs by latest outcome across the whole (resumed) run."""
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM latest WHERE run_id = ? GROUP BY status",
+                (self.run_id,)
+            ))
+
+    def finish_run(self) -> None:
+        with self.lock:
+            if self.run_id is not None:
+                self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                                  (time.time(), self.run_id))
+                self.conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def sha256_file(path: Path, chunk_size: int = 64 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Content-addressed store that keeps each distinct file body once.
+
+    Objects live under ``<output_dir>/.objects/<aa>/<sha256>`` and the
+    mirrored bill paths become hardlinks or relative symlinks to them.
+    Hardlinks save disk space in place; symlinks also keep duplicates out
+    of a git checkout, since git stores the link rather than the content.
+    Objects are made read-only because every linked path shares them.
+    """
+
+    DIRNAME = ".objects"
+    MODES = ('hardlink', 'symlink')
+
+    def __init__(self, output_dir: Path, mode: str = 'hardlink'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedupe mode: {mode}")
+        self.output_dir = output_dir
+        self.root = output_dir / self.DIRNAME
+        self.mode = mode
+        self.lock = threading.Lock()
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    def _is_linked(self, path: Path, blob: Path) -> bool:
+        if path.is_symlink():
+            return path.resolve() == blob.resolve()
+        return blob.exists() and os.path.samefile(path, blob)
+
+    def add(self, path: Path, sha256: Optional[str] = None) -> bool:
+        """
+        Move a file's content into the store and link the path to it.
+
+        Args:
+            path: Regular file inside the mirrored tree
+            sha256: Digest of the file if already known
+
+        Returns:
+            True if an existing object was reused (the file was a duplicate)
+        """
+        if sha256 is None:
+            sha256 = sha256_file(path)
+        blob = self.blob_path(sha256)
+
+        with self.lock:
+            if self._is_linked(path, blob):
+                return False
+
+            reused = blob.exists()
+            if not reused:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, blob)
+                except OSError:
+                    shutil.copy2(path, blob)
+                os.chmod(blob, 0o444)
+                if self.mode == 'hardlink' and os.path.samefile(path, blob):
+                    return False
+
+            tmp_path = path.with_name(path.name + '.link')
+            tmp_path.unlink(missing_ok=True)
+            if self.mode == 'symlink':
+                os.symlink(os.path.relpath(blob, path.parent), tmp_path)
+            else:
+                os.link(blob, tmp_path)
+            os.replace(tmp_path, path)
+            return reused
+
+    def dedupe_tree(self) -> Dict[str, int]:
+        """
+        Link every regular file under the output directory into the store.
+
+        Dot-prefixed entries (the store itself, manifests, journals) and
+        in-progress ``.part`` files are left alone.
+
+        Returns:
+            Counts of files scanned and duplicates found, and bytes saved
+        """
+        result = {'files': 0, 'duplicates': 0, 'bytes_saved': 0}
+        for path in sorted(self.output_dir.rglob('*')):
+            relative = path.relative_to(self.output_dir)
+            if any(part.startswith('.') for part in relative.parts):
+                continue
+            if path.is_symlink() or not path.is_file():
+                continue
+            if path.suffix in ('.part', '.link') or path.name.endswith('.part.json'):
+                continue
+
+            size = path.stat().st_size
+            result['files'] += 1
+            if self.add(path):
+                result['duplicates'] += 1
+                result['bytes_saved'] += size
+        return result
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse runs of whitespace to single spaces."""
+    return ' '.join(text.split())
+
+
+SECTION_LABEL_PATTERN = re.compile(r'Sec\.\s*(\d+[A-Za-z]?)')
+
+
+def _section_label(heading: str) -> Optional[str]:
+    """The "Sec. N" label at the start of a section heading, if any."""
+    match = SECTION_LABEL_PATTERN.search(heading)
+    return f"Sec. {match.group(1)}" if match else None
+
+
+def xml_sections(path: Path) -> List[Tuple[Optional[str], str, str]]:
+    """
+    Split a bill XML file into (section, heading, text) rows.
+
+    Each top-level BillSection becomes one row; the text outside them
+    (title, certificate, part headings, ...) is returned first as a row
+    without a section label.
+    """
+    root = ET.parse(path).getroot()
+    sections = []
+    outside = []
+
+    def walk(element: ET.Element) -> None:
+        # Same traversal as Element.itertext(), setting sections aside
+        if not isinstance(element.tag, str):
+            return
+        if element.tag.rsplit('}', 1)[-1] == 'BillSection':
+            header = next((child for child in element
+                           if child.tag.rsplit('}', 1)[-1] == 'BillSectionHeader'), None)
+            heading = _normalize_text(''.join(header.itertext())) if header is not None else ''
+            sections.append((_section_label(heading), heading,
+                             _normalize_text(''.join(element.itertext()))))
+            return
+        if element.text:
+            outside.append(element.text)
+        for child in element:
+            walk(child)
+            if child.tail:
+                outside.append(child.tail)
+
+    walk(root)
+    front = _normalize_text(''.join(outside))
+    return ([(None, '', front)] if front else []) + sections
+
+
+class BillHTMLSections(HTMLParser):
+    """
+    Collects the text of a bill HTM file, split into sections.
+
+    The legislature's HTM marks the start of every section with a
+    ``<!-- field: BeginningSection -->`` comment; the section heading
+    runs until the next field comment.
+    """
+
+    BLOCK_TAGS = {'br', 'div', 'p', 'table', 'td', 'th', 'tr', 'li', 'hr',
+                  'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # [heading pieces, text pieces] per section; the first holds the
+        # text before the first section
+        self.sections: List[Tuple[List[str], List[str]]] = [([], [])]
+        self.in_heading = False
+
+    def handle_comment(self, data: str) -> None:
+        field = data.strip()
+        if field == 'field: BeginningSection':
+            self.sections.append(([], []))
+            self.in_heading = True
+        elif field.startswith('field:'):
+            self.in_heading = False
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self.BLOCK_TAGS:
+            self.sections[-1][1].append(' ')
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.BLOCK_TAGS:
+            self.sections[-1][1].append(' ')
+
+    def handle_data(self, data: str) -> None:
+        heading, text = self.sections[-1]
+        text.append(data)
+        if self.in_heading:
+            heading.append(data)
+
+
+def htm_sections(path: Path) -> List[Tuple[Optional[str], str, str]]:
+    """Split a bill HTM file into (section, heading, text) rows (see xml_sections)."""
+    parser = BillHTMLSections()
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        parser.feed(f.read())
+    parser.close()
+
+    rows = []
+    for index, (heading, text) in enumerate(parser.sections):
+        heading = _normalize_text(''.join(heading))
+        text = _normalize_text(''.join(text))
+        if index == 0:
+            if text:
+                rows.append((None, '', text))
+        else:
+            rows.append((_section_label(heading), heading, text))
+    return rows
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 full-text index of bill sections.
+
+    Bill XML and HTM files are split into sections (one row per "Sec. N",
+    plus one for the text around them) so a query is an index lookup
+    instead of a scan of the tree, and every hit points at a bill file
+    and section. Files are re-indexed only when their size and mtime
+    change and their SHA-256 no longer matches. PDFs are not indexed.
+    """
+
+    FILENAME = ".search-index.sqlite3"
+    PARSERS = {'.xml': xml_sections, '.htm': htm_sections}
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.base_dir = path.parent
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                file_id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                bill TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sections (
+                id INTEGER PRIMARY KEY,
+                file_id INTEGER NOT NULL REFERENCES files(file_id),
+                section TEXT,
+                heading TEXT NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sections_file ON sections(file_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+                heading, text, content='sections', content_rowid='id', prefix='2 3'
+            );
+            CREATE TRIGGER IF NOT EXISTS sections_ai AFTER INSERT ON sections BEGIN
+                INSERT INTO sections_fts(rowid, heading, text)
+                VALUES (new.id, new.heading, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS sections_ad AFTER DELETE ON sections BEGIN
+                INSERT INTO sections_fts(sections_fts, rowid, heading, text)
+                VALUES ('delete', old.id, old.heading, old.text);
+            END;
+        """)
+        self.conn.commit()
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.base_dir).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def update_file(self, path: Path, sha256: Optional[str] = None) -> bool:
+        """
+        Index a bill file if it is new or changed since it was last indexed.
+
+        Args:
+            path: Bill XML or HTM file (other files are ignored)
+            sha256: Digest of the file if already known
+
+        Returns:
+            True if the file's sections were (re)indexed
+        """
+        parse = self.PARSERS.get(path.suffix.lower())
+        if parse is None:
+            return False
+        key = self._key(path)
+
+        try:
+            return self._update_file(path, key, parse, sha256)
+        except (OSError, ET.ParseError, sqlite3.Error) as e:
+            # e.g. "database is locked" while another process searches
+            print(f"⚠️  Not indexed ({e}): {path}")
+            return False
+
+    def _update_file(self, path: Path, key: str, parse, sha256: Optional[str]) -> bool:
+        """update_file without the error handling."""
+        stat = path.stat()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT file_id, size, mtime_ns, sha256 FROM files WHERE path = ?", (key,)
+            ).fetchone()
+        if row and (row[1], row[2]) == (stat.st_size, stat.st_mtime_ns):
+            return False
+        if sha256 is None:
+            sha256 = sha256_file(path)
+        if row and row[3] == sha256:
+            with self.lock, self.conn:
+                self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE file_id = ?",
+                                  (stat.st_size, stat.st_mtime_ns, row[0]))
+            return False
+        sections = parse(path)
+
+        with self.lock, self.conn:
+            values = (path.stem, stat.st_size, stat.st_mtime_ns, sha256, time.time())
+            if row:
+                file_id = row[0]
+                self.conn.execute("DELETE FROM sections WHERE file_id = ?", (file_id,))
+                self.conn.execute(
+                    "UPDATE files SET bill = ?, size = ?, mtime_ns = ?, sha256 = ?, indexed_at = ? "
+                    "WHERE file_id = ?", values + (file_id,)
+                )
+            else:
+                file_id = self.conn.execute(
+                    "INSERT INTO files (path, bill, size, mtime_ns, sha256, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (key,) + values
+                ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO sections (file_id, section, heading, text) VALUES (?, ?, ?, ?)",
+                ((file_id, section, heading, text) for section, heading, text in sections)
+            )
+        return True
+
+    def remove_missing(self) -> int:
+        """Drop the entries of indexed files that no longer exist."""
+        with self.lock:
+            rows = self.conn.execute("SELECT file_id, path FROM files").fetchall()
+        missing = [(file_id,) for file_id, key in rows if not (self.base_dir / key).exists()]
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM sections WHERE file_id = ?", missing)
+            self.conn.executemany("DELETE FROM files WHERE file_id = ?", missing)
+        return len(missing)
+
+    def update_tree(self, root: Path) -> Dict[str, int]:
+        """
+        Index every new or changed bill XML/HTM file under a directory.
+
+        Dot-prefixed entries (blob store, manifests, journals) are left
+        alone, and entries of files that were deleted are dropped.
+
+        Returns:
+            Counts of files scanned, (re)indexed and removed
+        """
+        result = {'files': 0, 'indexed': 0, 'removed': 0}
+        for path in sorted(root.rglob('*')):
+            relative = path.relative_to(root)
+            if any(part.startswith('.') for part in relative.parts):
+                continue
+            if path.suffix.lower() not in self.PARSERS or not path.is_file():
+                continue
+
+            result['files'] += 1
+            if self.update_file(path):
+                result['indexed'] += 1
+        result['removed'] = self.remove_missing()
+        return result
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Find the sections matching an FTS5 query.
+
+        Args:
+            query: FTS5 query over section headings and text, e.g.
+                   '"department of ecology"', 'salmon AND recover*',
+                   '"43.88.030"' or 'NEAR(ecology grant, 10)'
+            limit: Maximum number of sections returned
+
+        Returns:
+            Best matches first, each with its bill, file path, section
+            label, heading and a snippet of the matching text
+
+        Raises:
+            sqlite3.OperationalError: If the query is not valid FTS5 syntax
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT f.bill, f.path, s.section, s.heading,
+                       snippet(sections_fts, 1, '[', ']', '…', 16)
+                FROM sections_fts
+                JOIN sections s ON s.id = sections_fts.rowid
+                JOIN files f ON f.file_id = s.file_id
+                WHERE sections_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (query, limit)
+            ).fetchall()
+        return [
+            {'bill': bill, 'path': path, 'section': section, 'heading': heading,
+             'snippet': snippet}
+            for bill, path, section, heading, snippet in rows
+        ]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
 
 class WABillDownloader:
     """Downloads bills from Washington State Legislature website."""
 
     BASE_URL = "https://lawfilesext.leg.wa.gov"
+    USER_AGENT = 'WA-Bills-GitHub-Archive-Bot/1.0 (Educational/Research Purpose)'
+    CHUNK_SIZE = 64 * 1024
+    # File extension served for each format directory (anything else is HTML)
+    FORMAT_EXTENSIONS = {'Pdf': 'pdf', 'Htm': 'htm', 'Xml': 'xml'}
+
+    # Retry policy shared by both HTTP backends
+    RETRY_TOTAL = 3
+    RETRY_BACKOFF = 1
+    RETRY_STATUSES = [429, 500, 502, 503, 504]
 
-    def __init__(self, output_dir: str = "bills", delay: float = 1.0):
+    # Range discovery: consecutive misses before galloping, max stride, and
+    # how many stepped-over numbers the final pass probes one by one
+    GAP_THRESHOLD = 20
+    MAX_GALLOP = 64
+    MAX_GAP_FILL = 500
+    # Substitute versions probed once the original bill number is found
+    SUBSTITUTE_SUFFIXES = ['-S', '-S2', '-S3', '-S4']
+    ENGROSSED_SUFFIX = '.E'
+
+    def __init__(self, output_dir: str = "bills", delay: float = 1.0,
+                 workers: int = 1, sync: bool = False,
+                 hash_files: bool = True, negative_ttl: float = 7 * 86400,
+                 timeout: float = 30.0, pool_size: Optional[int] = None,
+                 journal_path: Optional[str] = None, resume: Optional[str] = None,
+                 dedupe: Optional[str] = None, metrics_path: Optional[str] = None,
+                 search_index_path: Optional[str] = None,
+                 on_saved: Optional[Callable[[Path], None]] = None):
         """
         Initialize the downloader.
 
         Args:
             output_dir: Directory to save downloaded bills
-            delay: Delay in seconds between requests (be respectful)
+            delay: Delay in seconds between requests (be respectful).
+                   Enforced per host as a token-bucket rate of 1/delay
+                   requests per second, shared by all workers.
+            workers: Number of requests to keep in flight (1 = serial)
+            sync: Re-check existing files with conditional requests
+                  (If-None-Match / If-Modified-Since) instead of skipping them
+            hash_files: Compute a SHA-256 of each file while it streams
+            negative_ttl: Seconds to remember a 404 before asking again
+            timeout: Per-request timeout in seconds
+            pool_size: Keep-alive connections per host, shared by all
+                       workers (default: max(10, workers))
+            journal_path: SQLite journal file (default: <output_dir>/.download-journal.sqlite3);
+                          pass "" to disable journaling
+            resume: None to start a fresh run, "resume" to continue the
+                    job's last run skipping settled URLs, or "failed" to
+                    continue it retrying only URLs whose last outcome failed
+            dedupe: None, or "hardlink"/"symlink" to keep saved files in a
+                    content-addressed BlobStore under <output_dir>/.objects
+            metrics_path: Append per-request metrics as JSON lines to this file
+            search_index_path: SQLite full-text index to update with every saved
+                               XML/HTM file (default: no indexing)
+            on_saved: Called with the path of every new or changed file once
+                      it is in place (from worker threads when workers > 1,
+                      and always on the async backend)
         """
         self.output_dir = Path(output_dir)
         self.delay = delay
+        self.workers = max(1, workers)
+        self.sync = sync
+        self.hash_files = hash_files
+        self.timeout = timeout
+        self.pool_size = pool_size or max(10, self.workers)
+        self.metrics = MetricsRecorder(metrics_path)
+        self.adapter = self._create_adapter()
         self.session = self._create_session()
+        self.manifest = DownloadManifest(self.output_dir)
+        self.negative_cache = NegativeCache(self.output_dir, negative_ttl)
+        self._listings: Dict[str, Optional[List[str]]] = {}
+        if journal_path is None:
+            journal_path = str(self.output_dir / DownloadJournal.FILENAME)
+        self.journal = DownloadJournal(Path(journal_path)) if journal_path else None
+        self.resume = resume
+        self.store = BlobStore(self.output_dir, dedupe) if dedupe else None
+        self.search_index = None
+        if search_index_path:
+            try:
+                self.search_index = SearchIndex(Path(search_index_path))
+            except sqlite3.OperationalError as e:  # e.g. SQLite built without FTS5
+                print(f"⚠️  Search index disabled ({e})")
+        self.on_saved = on_saved
         self.stats = {
             'downloaded': 0,
+            'unchanged': 0,
             'skipped': 0,
             'failed': 0
         }
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        # Set by cancel(): no new requests are started
+        self.cancelled = threading.Event()
+
+    def _create_adapter(self) -> TimedHTTPAdapter:
+        """
+        Create the retrying connection pools shared by all sessions.
+
+        Holds at most ``pool_size`` connections per host; a thread that
+        finds them all in use waits for one instead of opening another.
+        """
+        retry_strategy = ThrottleRetry(
+            total=self.RETRY_TOTAL,
+            backoff_factor=self.RETRY_BACKOFF,
+            status_forcelist=self.RETRY_STATUSES,
+        )
+        return TimedHTTPAdapter(self.metrics, max_retries=retry_strategy,
+                                pool_maxsize=self.pool_size, pool_block=True)
 
     def _create_session(self) -> requests.Session:
-        """Create a session with retry logic."""
+        """Create a session on the shared connection pools."""
         session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
         # Set a user agent to identify the bot
         session.headers.update({
-            'User-Agent': 'WA-Bills-GitHub-Archive-Bot/1.0 (Educational/Research Purpose)'
+            'User-Agent': self.USER_AGENT
         })
         return session
 
+    def _get_session(self) -> requests.Session:
+        """
+        Return a session owned by the calling thread.
+
+        Sessions are per thread (they are not thread-safe), but all of them
+        share self.adapter, so --pool-size caps connections per host.
+        """
+        if self.workers == 1:
+            return self.session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._create_session()
+            self._local.session = session
+        return session
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        """Return the shared rate limiter for the URL's host."""
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = 1.0 / self.delay if self.delay > 0 else 0
+                bucket = TokenBucket(rate)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _record(self, key: str, url: Optional[str] = None,
+                status: Optional[str] = None, detail: Optional[str] = None) -> None:
+        """
+        Increment a stats counter and journal the outcome for ``url``.
+
+        Safe to call from worker threads. ``status`` overrides the journal
+        status when it is more specific than the stats key (e.g. a 404 is
+        counted as 'failed' but journaled as 'not_found').
+        """
+        with self._stats_lock:
+            self.stats[key] += 1
+        if url is not None and self.journal is not None:
+            self.journal.record(url, status or key, detail)
+
+    def start_job(self, job: str) -> None:
+        """Open a journal run for a named job (config file or range)."""
+        if self.journal is not None:
+            self.journal.start_run(job, resume=self.resume is not None)
+
+    def _journal_skips(self, url: str) -> bool:
+        """True if the journal says this URL needs no work in resume mode."""
+        if self.journal is None or self.resume is None:
+            return False
+        status = self.journal.status(url)
+        if self.resume == 'failed':
+            return status != 'failed'
+        return status in DownloadJournal.SETTLED
+
     def construct_url(self, biennium: str, chamber: str, bill_number: str,
                      format_type: str = "Pdf", bill_type: str = "Bills",
                      category: str = None) -> str:
@@ -68,27 +1078,216 @@ class WABillDownloader:
             biennium: e.g., "2023-24"
             chamber: "House" or "Senate"
             bill_number: e.g., "1234" or "1234-S"
-            format_type: "Pdf" or "Htm"
+            format_type: "Pdf", "Htm" or "Xml"
             bill_type: "Bills", "Session Laws", etc.
             category: Optional subdirectory like "Senate Bills", "House Bills"
 
         Returns:
             Full URL to the bill
         """
-        ext = "pdf" if format_type == "Pdf" else "htm"
+        ext = self.FORMAT_EXTENSIONS.get(format_type, "htm")
+        directory = self.construct_dir_url(biennium, chamber, format_type,
+                                           bill_type, category)
+        return f"{directory}{bill_number}.{ext}"
+
+    def construct_dir_url(self, biennium: str, chamber: str,
+                          format_type: str = "Pdf", bill_type: str = "Bills",
+                          category: str = None) -> str:
+        """
+        Construct the URL of the directory that holds a category of bills.
 
-        # Construct the category path
+        Returns:
+            Directory URL ending in a slash
+        """
         if category is None:
             category = f"{chamber} Bills"
 
         # URL encode spaces
         category_encoded = quote(category, safe='')
 
-        path = f"/Biennium/{biennium}/{format_type}/{bill_type}/{category_encoded}/{bill_number}.{ext}"
-        return f"{self.BASE_URL}{path}"
+        return f"{self.BASE_URL}/Biennium/{biennium}/{format_type}/{bill_type}/{category_encoded}/"
+
+    def _part_paths(self, output_path: Path) -> Tuple[Path, Path]:
+        """Return the in-progress data file and its validator sidecar."""
+        part_path = output_path.with_name(output_path.name + '.part')
+        return part_path, output_path.with_name(output_path.name + '.part.json')
+
+    def _request_headers(self, output_path: Path,
+                         entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        Build conditional and resume headers for a download.
+
+        A leftover ``.part`` file is resumed with a Range request guarded by
+        If-Range, so the server sends the whole body again if the bill
+        changed in the meantime. Otherwise a manifest entry for an existing
+        file turns the request into a conditional GET.
+        """
+        headers = {}
+        part_path, meta_path = self._part_paths(output_path)
+        offset = part_path.stat().st_size if part_path.exists() else 0
+
+        if offset and meta_path.exists():
+            with open(meta_path, 'r') as f:
+                validators = json.load(f)
+            validator = validators.get('etag') or validators.get('last_modified')
+            if validator:
+                headers['Range'] = f"bytes={offset}-"
+                headers['If-Range'] = validator
+                return headers
+
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _open_part(self, output_path: Path, status: int,
+                   headers: Mapping[str, str]) -> Tuple[BinaryIO, Optional[Any]]:
+        """
+        Open the ``.part`` file for a 200/206 response body.
+
+        Returns:
+            (file to write chunks to, running SHA-256 or None if disabled)
+        """
+        part_path, meta_path = self._part_paths(output_path)
+        digest = hashlib.sha256() if self.hash_files else None
+
+        if status == 206:
+            offset = part_path.stat().st_size
+            content_range = headers.get('Content-Range', '')
+            if not content_range.startswith(f"bytes {offset}-"):
+                part_path.unlink()
+                raise ValueError(
+                    f"Unexpected Content-Range {content_range!r} for offset {offset}"
+                )
+            if digest is not None:
+                with open(part_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                        digest.update(chunk)
+            return open(part_path, 'ab'), digest
+
+        # Remember what we are fetching so an interrupted download can resume
+        with open(meta_path, 'w') as f:
+            json.dump({
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+            }, f)
+        return open(part_path, 'wb'), digest
+
+    def _close_part(self, f: BinaryIO,
+                    digest: Optional[Any]) -> Tuple[Optional[str], int]:
+        """
+        Flush, fsync and close a ``.part`` file.
+
+        Returns:
+            (SHA-256 hex digest or None if hashing is disabled, total size)
+        """
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+        f.close()
+        return (digest.hexdigest() if digest is not None else None), size
+
+    def _prepare_download(self, url: str, output_path: Path, skip_existing: bool,
+                          probe: bool = False) -> Optional[Tuple[Optional[Dict], Dict[str, str]]]:
+        """
+        Decide whether a download needs a request at all.
+
+        Known 404s from the negative cache are only skipped when ``probe``
+        is set, i.e. for discover_range's guesses; requested bills are
+        always asked for.
+
+        Returns:
+            None if the file is skipped, otherwise (manifest entry, headers)
+        """
+        if self.cancelled.is_set():
+            # Not journaled, so --resume picks the URL up again
+            return None
+
+        if self._journal_skips(url):
+            print(f"⏭️  Skipping (journal): {output_path.name}")
+            self._record('skipped')
+            return None
+
+        # Check if already exists
+        if skip_existing and output_path.exists():
+            print(f"⏭️  Skipping (exists): {output_path.name}")
+            self._record('skipped', url)
+            return None
+
+        if probe and self.negative_cache.is_missing(url):
+            print(f"⏭️  Skipping (known 404): {output_path.name}")
+            self._record('skipped', url, status='not_found')
+            return None
+
+        # Create parent directories
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        entry = self.manifest.get(output_path) if output_path.exists() else None
+        headers = self._request_headers(output_path, entry)
+
+        if 'Range' in headers:
+            offset = self._part_paths(output_path)[0].stat().st_size
+            print(f"⬇️  Resuming: {url} (from byte {offset})")
+        else:
+            print(f"⬇️  Downloading: {url}")
+        return entry, headers
+
+    def _reject(self, url: str, output_path: Path, status: int,
+                probe: bool = False) -> bool:
+        """
+        Record a response that carries no new body. Always returns False.
+
+        A 404 is added to the negative cache only when ``probe`` is set.
+        """
+        if status == 304:
+            print(f"🔁 Unchanged: {output_path.name}")
+            self._record('unchanged', url)
+            return False
+
+        if status == 404:
+            if probe:
+                self.negative_cache.add(url)
+            print(f"❌ Not found (404): {url}")
+            self._record('failed', url, status='not_found')
+            return False
+
+        if status == 416:
+            # Stale partial file; start from scratch next time
+            self._part_paths(output_path)[0].unlink(missing_ok=True)
+        print(f"❌ Failed ({status}): {url}")
+        self._record('failed', url, detail=f"HTTP {status}")
+        return False
+
+    def _finish_download(self, url: str, output_path: Path, entry: Optional[Dict],
+                         headers: Mapping[str, str], sha256: Optional[str],
+                         size: int) -> bool:
+        """Move a completed ``.part`` file into place and record it."""
+        part_path, meta_path = self._part_paths(output_path)
+        self.manifest.update(output_path, url, headers, sha256, size)
+        self.negative_cache.discard(url)
+        meta_path.unlink(missing_ok=True)
+
+        if sha256 and entry and entry.get('sha256') == sha256 and output_path.exists():
+            part_path.unlink()
+            print(f"🔁 Unchanged: {output_path.name}")
+            self._record('unchanged', url)
+            return False
+
+        os.replace(part_path, output_path)
+        print(f"✅ Saved: {output_path}")
+        if self.store is not None and self.store.add(output_path, sha256):
+            print(f"♻️  Duplicate content, linked to existing object: {output_path.name}")
+        self._record('downloaded', url)
+        if self.on_saved is not None:
+            self.on_saved(output_path)
+        if self.search_index is not None:
+            self.search_index.update_file(output_path, sha256)
+        return True
 
     def download_bill(self, url: str, output_path: Path,
-                     skip_existing: bool = True) -> bool:
+                     skip_existing: bool = True, probe: bool = False) -> bool:
         """
         Download a single bill.
 
@@ -96,56 +1295,73 @@ class WABillDownloader:
             url: URL to download from
             output_path: Local path to save to
             skip_existing: Skip if file already exists
+            probe: The URL is a guess (discover_range): skip and remember 404s
+
+        The body is streamed into ``<name>.part`` and renamed over the
+        output path only once it is complete and fsynced, so an
+        interrupted run never leaves a truncated bill behind; the next run
+        resumes the partial file with a Range request.
+
+        Existing files that have a manifest entry are revalidated with a
+        conditional request when ``skip_existing`` is False, so an
+        unchanged bill costs a 304 response with no body.
 
         Returns:
-            True if downloaded, False if skipped or failed
+            True if downloaded, False if skipped, unchanged or failed
         """
-        # Check if already exists
-        if skip_existing and output_path.exists():
-            print(f"⏭️  Skipping (exists): {output_path.name}")
-            self.stats['skipped'] += 1
+        prepared = self._prepare_download(url, output_path, skip_existing, probe)
+        if prepared is None:
             return False
+        entry, headers = prepared
 
-        # Create parent directories
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        record = self.metrics.begin(url)
+        # Be respectful with rate limiting
+        record['rate_wait'] = self._bucket_for(url).acquire()
+        started = time.perf_counter()
 
         try:
-            print(f"⬇️  Downloading: {url}")
-            response = self.session.get(url, timeout=30)
+            with self._get_session().get(url, headers=headers, timeout=self.timeout,
+                                         stream=True) as response:
+                record['ttfb'] = time.perf_counter() - started
+                record['status'] = response.status_code
+                retries = getattr(response.raw, 'retries', None)
+                record['retries'] = len(retries.history) if retries else 0
 
-            # Check if successful
-            if response.status_code == 200:
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                print(f"✅ Saved: {output_path}")
-                self.stats['downloaded'] += 1
-                return True
-            elif response.status_code == 404:
-                print(f"❌ Not found (404): {url}")
-                self.stats['failed'] += 1
-                return False
-            else:
-                print(f"❌ Failed ({response.status_code}): {url}")
-                self.stats['failed'] += 1
-                return False
+                # Check if successful
+                if response.status_code not in (200, 206):
+                    return self._reject(url, output_path, response.status_code, probe)
 
-        except requests.exceptions.RequestException as e:
+                f, digest = self._open_part(output_path, response.status_code,
+                                            response.headers)
+                try:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        f.write(chunk)
+                        record['bytes'] += len(chunk)
+                        if digest is not None:
+                            digest.update(chunk)
+                finally:
+                    sha256, size = self._close_part(f, digest)
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            record['error'] = str(e)
             print(f"❌ Error downloading {url}: {e}")
-            self.stats['failed'] += 1
+            self._record('failed', url, detail=str(e))
             return False
         finally:
-            # Be respectful with rate limiting
-            time.sleep(self.delay)
+            self.metrics.finish(record, started)
+
+        return self._finish_download(url, output_path, entry, response.headers,
+                                     sha256, size)
 
-    def download_bill_spec(self, spec: Dict) -> bool:
+    def spec_location(self, spec: Dict) -> Tuple[str, Path]:
         """
-        Download a bill from a specification dict.
+        Resolve a bill specification to its URL and local output path.
 
         Args:
             spec: Dictionary with bill details (biennium, chamber, number, etc.)
 
         Returns:
-            True if successful
+            (url, output_path) where the path mirrors the URL structure
         """
         biennium = spec['biennium']
         chamber = spec.get('chamber', 'House')
@@ -161,7 +1377,7 @@ class WABillDownloader:
         )
 
         # Construct local path that mirrors the URL structure
-        ext = "pdf" if format_type == "Pdf" else "htm"
+        ext = self.FORMAT_EXTENSIONS.get(format_type, "htm")
         category_name = category or f"{chamber} Bills"
 
         output_path = (
@@ -173,7 +1389,21 @@ class WABillDownloader:
             f"{bill_number}.{ext}"
         )
 
-        return self.download_bill(url, output_path)
+        return url, output_path
+
+    def download_bill_spec(self, spec: Dict, probe: bool = False) -> bool:
+        """
+        Download a bill from a specification dict.
+
+        Args:
+            spec: Dictionary with bill details (biennium, chamber, number, etc.)
+            probe: See download_bill
+
+        Returns:
+            True if successful
+        """
+        url, output_path = self.spec_location(spec)
+        return self.download_bill(url, output_path, skip_existing=not self.sync, probe=probe)
 
     def download_from_config(self, config_path: str):
         """
@@ -189,18 +1419,14 @@ class WABillDownloader:
         print(f"📋 Found {len(bills)} bills to download")
         print("=" * 60)
 
-        for bill in bills:
-            self.download_bill_spec(bill)
+        self.start_job(f"config:{config_path}")
 
-        # Print summary
-        print("=" * 60)
-        print("📊 Download Summary:")
-        print(f"   ✅ Downloaded: {self.stats['downloaded']}")
-        print(f"   ⏭️  Skipped: {self.stats['skipped']}")
-        print(f"   ❌ Failed: {self.stats['failed']}")
+        self.download_specs(bills)
+        self.print_summary()
 
     def download_range(self, biennium: str, chamber: str,
-                      start: int, end: int, format_type: str = "Pdf"):
+                      start: int, end: int, format_type: str = "Pdf",
+                      discover: bool = False):
         """
         Download a range of bill numbers.
 
@@ -209,26 +1435,480 @@ class WABillDownloader:
             chamber: "House" or "Senate"
             start: Starting bill number
             end: Ending bill number (inclusive)
-            format_type: "Pdf" or "Htm"
+            format_type: "Pdf", "Htm" or "Xml"
+            discover: Only request files that exist, including substitute
+                      and engrossed versions (see discover_range)
         """
         print(f"📋 Downloading {chamber} bills {start}-{end} for {biennium}")
         print("=" * 60)
 
-        for num in range(start, end + 1):
-            bill_spec = {
-                'biennium': biennium,
-                'chamber': chamber,
-                'number': str(num),
-                'format': format_type
-            }
-            self.download_bill_spec(bill_spec)
+        self.start_job(f"range:{biennium}:{chamber}:{start}-{end}:{format_type}"
+                       f"{':discover' if discover else ''}")
+
+        if discover:
+            self.discover_range(biennium, chamber, start, end, format_type)
+        else:
+            specs = [
+                {
+                    'biennium': biennium,
+                    'chamber': chamber,
+                    'number': str(num),
+                    'format': format_type
+                }
+                for num in range(start, end + 1)
+            ]
+            self.download_specs(specs)
+        self.print_summary()
+
+    def list_directory(self, biennium: str, chamber: str,
+                       format_type: str = "Pdf", bill_type: str = "Bills",
+                       category: str = None) -> Optional[List[str]]:
+        """
+        Fetch a directory listing once and return the bill names it holds.
+
+        Returns:
+            Sorted file names without extension (e.g. "1050", "1050-S.E"),
+            or None if the server does not provide a listing
+        """
+        url = self.construct_dir_url(biennium, chamber, format_type, bill_type, category)
+        if url in self._listings:
+            return self._listings[url]
+
+        ext = self.FORMAT_EXTENSIONS.get(format_type, "htm")
+        names = None
+        self._bucket_for(url).acquire()
+        try:
+            print(f"📂 Listing: {url}")
+            response = self._get_session().get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                found = set()
+                for href in re.findall(r'href="([^"]+)"', response.text, re.IGNORECASE):
+                    name = unquote(href.rstrip('/').rsplit('/', 1)[-1])
+                    if name.lower().endswith(f".{ext}"):
+                        found.add(name[:-len(ext) - 1])
+                names = sorted(found)
+            else:
+                print(f"⚠️  No listing ({response.status_code}): {url}")
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️  No listing ({e}): {url}")
 
-        # Print summary
+        self._listings[url] = names
+        return names
+
+    def discover_range(self, biennium: str, chamber: str, start: int, end: int,
+                       format_type: str = "Pdf") -> None:
+        """
+        Download only the bills that exist in a number range.
+
+        Uses the directory listing when the server provides one, which
+        also picks up every substitute/engrossed version. Otherwise falls
+        back to probing: known 404s are skipped via the negative cache,
+        long runs of misses are crossed with a doubling stride, and each
+        bill found is checked for substitute and engrossed versions. When a
+        bill turns up past a jump, the start of its run is found by
+        bisecting the numbers jumped over (so a gap costs O(log stride)
+        probes, not one per number) and the rest of the run is filled in.
+        A final pass then probes up to MAX_GAP_FILL of the numbers that
+        were stepped over and are not known 404s, so short runs inside a
+        gap are not lost; numbers left for a later run are printed.
+        """
+        base_spec = {'biennium': biennium, 'chamber': chamber, 'format': format_type}
+        names = self.list_directory(biennium, chamber, format_type)
+
+        if names is not None:
+            specs = []
+            for name in names:
+                match = re.match(r'\d+', name)
+                if match and start <= int(match.group(0)) <= end:
+                    specs.append({**base_spec, 'number': name})
+            print(f"📋 Listing has {len(specs)} files in range")
+            self.download_specs(specs)
+            return
+
+        probed = set()
+
+        def probe(number: int) -> bool:
+            probed.add(number)
+            return self._probe_bill(base_spec, number)
+
+        try:
+            misses = 0
+            step = 1
+            previous = start - 1
+            num = start
+            while num <= end and not self.cancelled.is_set():
+                if probe(num):
+                    # Bisect the numbers stepped over for the first bill of
+                    # this run (previous is a miss), then fill in the run
+                    missing, found = previous, num
+                    while found - missing > 1:
+                        middle = (missing + found) // 2
+                        if probe(middle):
+                            found = middle
+                        else:
+                            missing = middle
+                    for skipped in range(found + 1, num):
+                        if skipped not in probed:
+                            probe(skipped)
+                    misses = 0
+                    step = 1
+                else:
+                    misses += 1
+                    if misses >= self.GAP_THRESHOLD:
+                        step = min(step * 2, self.MAX_GALLOP)
+                previous = num
+                num += step
+
+            # Galloping can step over short runs of bills; probe the gaps one
+            # by one, up to MAX_GAP_FILL numbers. Known 404s are left out, so
+            # a rerun carries on where this pass stopped.
+            if not self.cancelled.is_set():
+                skipped = [
+                    n for n in range(start, end + 1) if n not in probed
+                    and not self.negative_cache.is_missing(
+                        self.spec_location({**base_spec, 'number': str(n)})[0])
+                ]
+                if skipped:
+                    print(f"🔎 Probing {min(len(skipped), self.MAX_GAP_FILL)} of "
+                          f"{len(skipped)} numbers stepped over: {format_ranges(skipped)}")
+                for number in skipped[:self.MAX_GAP_FILL]:
+                    if self.cancelled.is_set():
+                        break
+                    probe(number)
+                unprobed = [n for n in skipped if n not in probed]
+                if unprobed:
+                    print(f"⚠️  Not probed yet (run again to continue): "
+                          f"{format_ranges(unprobed)}")
+        finally:
+            self._save_state()
+
+    def _probe_bill(self, base_spec: Dict, num: int) -> bool:
+        """
+        Download a bill number and any substitute versions of it.
+
+        Returns:
+            True if the original bill exists upstream (or locally)
+        """
+        def fetch(number: str) -> bool:
+            spec = {**base_spec, 'number': number}
+            self.download_bill_spec(spec, probe=True)
+            return self.spec_location(spec)[1].exists()
+
+        if not fetch(str(num)):
+            return False
+
+        versions = [str(num)]
+        for suffix in self.SUBSTITUTE_SUFFIXES:
+            if not fetch(f"{num}{suffix}"):
+                break
+            versions.append(f"{num}{suffix}")
+
+        for version in versions:
+            fetch(f"{version}{self.ENGROSSED_SUFFIX}")
+        return True
+
+    def download_specs(self, specs: List[Dict]) -> None:
+        """
+        Download a list of bill specifications.
+
+        Runs serially when ``workers`` is 1, otherwise keeps up to
+        ``workers`` requests in flight on a thread pool.
+
+        Args:
+            specs: Bill specification dicts (see download_bill_spec)
+        """
+        try:
+            if self.workers == 1:
+                for spec in specs:
+                    self.download_bill_spec(spec)
+                return
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # Consume results so worker exceptions are not silently dropped
+                for _ in pool.map(self.download_bill_spec, specs):
+                    pass
+        finally:
+            self._save_state()
+
+    def cancel(self) -> None:
+        """
+        Stop starting requests; downloads already in progress still finish.
+        Safe to call from any thread.
+        """
+        self.cancelled.set()
+
+    def _save_state(self) -> None:
+        """Persist the download manifest and the negative cache."""
+        self.manifest.save()
+        self.negative_cache.save()
+
+    def close(self) -> None:
+        """Release pooled HTTP connections, the journal, the search index and the metrics file."""
+        self.session.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        self.metrics.close()
+
+    def print_metrics(self) -> None:
+        """Print latency percentiles and throughput of this run's requests."""
+        summary = self.metrics.summary()
+        if not summary['requests']:
+            return
+        print(f"⏱️  Requests: {summary['requests']}, "
+              f"{summary['bytes'] / 1_000_000:.1f} MB in {summary['seconds']:.1f}s "
+              f"({summary['mb_per_s']:.2f} MB/s), {summary['retries']} retries")
+        print(f"   {'':<10} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, values in summary['timings'].items():
+            cells = [f"{v * 1000:>6.0f}ms" if v is not None else f"{'-':>8}"
+                     for v in values.values()]
+            print(f"   {name:<10} {' '.join(cells)}")
+
+    def print_summary(self) -> None:
+        """
+        Print the download counters.
+
+        With a journal the counts cover every attempt of the job,
+        including earlier runs that this one resumed.
+        """
         print("=" * 60)
-        print("📊 Download Summary:")
-        print(f"   ✅ Downloaded: {self.stats['downloaded']}")
-        print(f"   ⏭️  Skipped: {self.stats['skipped']}")
-        print(f"   ❌ Failed: {self.stats['failed']}")
+        self.print_metrics()
+        if self.journal is None or self.journal.run_id is None:
+            print("📊 Download Summary:")
+            print(f"   ✅ Downloaded: {self.stats['downloaded']}")
+            print(f"   🔁 Unchanged: {self.stats['unchanged']}")
+            print(f"   ⏭️  Skipped: {self.stats['skipped']}")
+            print(f"   ❌ Failed: {self.stats['failed']}")
+            return
+
+        self.journal.finish_run()
+        counts = self.journal.summary()
+        print(f"📊 Download Summary (journal run {self.journal.run_id}):")
+        print(f"   ✅ Downloaded: {counts.get('downloaded', 0)}")
+        print(f"   🔁 Unchanged: {counts.get('unchanged', 0)}")
+        print(f"   ⏭️  Skipped: {counts.get('skipped', 0)}")
+        print(f"   🚫 Not found: {counts.get('not_found', 0)}")
+        print(f"   ❌ Failed: {counts.get('failed', 0)}")
+
+
+class AsyncWABillDownloader(WABillDownloader):
+    """
+    WABillDownloader on an asyncio/aiohttp backend.
+
+    All requests share one aiohttp session whose connector holds up to
+    ``pool_size`` keep-alive connections, and ``workers`` coroutines are
+    kept in flight instead of threads. Retries mirror the urllib3 policy
+    of the requests backend: 429/5xx and connection errors are retried
+    with exponential backoff, and a Retry-After sent with 429 or 503 is
+    honored instead. The synchronous API (download_bill, download_bill_spec,
+    download_specs, ...) is unchanged, so config and range modes work as
+    before.
+    """
+
+    def __init__(self, *args, keepalive: float = 30.0, **kwargs):
+        """
+        Initialize the downloader.
+
+        Args:
+            keepalive: Seconds an idle pooled connection is kept open
+            *args, **kwargs: See WABillDownloader
+        """
+        if aiohttp is None:
+            raise ImportError("The async backend requires aiohttp (pip install aiohttp)")
+        super().__init__(*args, **kwargs)
+        self.keepalive = keepalive
+        self._loop = asyncio.new_event_loop()
+        self._client: Optional["aiohttp.ClientSession"] = None
+
+    def _get_client(self) -> "aiohttp.ClientSession":
+        """Return the shared aiohttp session, creating it on first use."""
+        if self._client is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive,
+            )
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, connect=self.timeout,
+                                              sock_read=self.timeout),
+                headers={'User-Agent': self.USER_AGENT},
+                trace_configs=[self._trace_config()],
+            )
+        return self._client
+
+    def close(self) -> None:
+        """Close pooled connections, the file-work threads and the event loop."""
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.close())
+            self._client = None
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
+        super().close()
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (1-based): the
+        Retry-After value if one is given, else exponential backoff.
+        """
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    when = email.utils.parsedate_to_datetime(retry_after)
+                    return max(0.0, when.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        if attempt <= 1:
+            return 0.0
+        return self.RETRY_BACKOFF * (2 ** (attempt - 1))
+
+    async def _get(self, url: str, headers: Dict[str, str],
+                   record: Optional[Dict] = None) -> "aiohttp.ClientResponse":
+        """GET with the shared retry policy; the caller releases the response."""
+        client = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(url, headers=headers,
+                                            trace_request_ctx=record)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                attempt += 1
+                if attempt > self.RETRY_TOTAL:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt, None))
+                continue
+            finally:
+                if record is not None:
+                    record['retries'] = attempt
+
+            if response.status in self.RETRY_STATUSES and attempt < self.RETRY_TOTAL:
+                attempt += 1
+                # As with ThrottleRetry, only 413/429/503 are paced by Retry-After
+                retry_after = (response.headers.get('Retry-After')
+                               if response.status in ThrottleRetry.RETRY_AFTER_STATUS_CODES
+                               else None)
+                response.release()
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
+                continue
+            return response
+
+    def _trace_config(self) -> "aiohttp.TraceConfig":
+        """Trace hooks that fill in DNS and connect times of metrics records."""
+        async def start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        def finish(field):
+            async def hook(session, ctx, params):
+                record = ctx.trace_request_ctx
+                if record is not None:
+                    elapsed = time.perf_counter() - ctx.started
+                    if field == 'connect' and record['dns'] is not None:
+                        elapsed = max(0.0, elapsed - record['dns'])
+                    record[field] = (record[field] or 0.0) + elapsed
+            return hook
+
+        async def dns_start(session, ctx, params):
+            ctx.dns_started = time.perf_counter()
+
+        async def dns_end(session, ctx, params):
+            record = ctx.trace_request_ctx
+            if record is not None:
+                record['dns'] = (record['dns'] or 0.0) + time.perf_counter() - ctx.dns_started
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_start.append(start)
+        trace.on_connection_create_end.append(finish('connect'))
+        trace.on_dns_resolvehost_start.append(dns_start)
+        trace.on_dns_resolvehost_end.append(dns_end)
+        return trace
+
+    async def adownload_bill(self, url: str, output_path: Path,
+                             skip_existing: bool = True, probe: bool = False) -> bool:
+        """Coroutine version of download_bill."""
+        prepared = self._prepare_download(url, output_path, skip_existing, probe)
+        if prepared is None:
+            return False
+        entry, headers = prepared
+
+        record = self.metrics.begin(url)
+        # Be respectful with rate limiting
+        record['rate_wait'] = await self._bucket_for(url).acquire_async()
+        started = time.perf_counter()
+
+        try:
+            response = await self._get(url, headers, record)
+            async with response:
+                record['ttfb'] = time.perf_counter() - started
+                record['status'] = response.status
+
+                # Check if successful
+                if response.status not in (200, 206):
+                    return self._reject(url, output_path, response.status, probe)
+
+                # Blocking file work (re-hashing a resumed .part, fsync,
+                # the final rename and on_saved) runs off the event loop
+                f, digest = await self._loop.run_in_executor(
+                    None, self._open_part, output_path, response.status, response.headers
+                )
+                try:
+                    async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                        f.write(chunk)
+                        record['bytes'] += len(chunk)
+                        if digest is not None:
+                            digest.update(chunk)
+                finally:
+                    sha256, size = await self._loop.run_in_executor(
+                        None, self._close_part, f, digest
+                    )
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            record['error'] = str(e)
+            print(f"❌ Error downloading {url}: {e}")
+            self._record('failed', url, detail=str(e))
+            return False
+        finally:
+            self.metrics.finish(record, started)
+
+        return await self._loop.run_in_executor(
+            None, self._finish_download, url, output_path, entry, response.headers,
+            sha256, size
+        )
+
+    async def adownload_bill_spec(self, spec: Dict) -> bool:
+        """Coroutine version of download_bill_spec."""
+        url, output_path = self.spec_location(spec)
+        return await self.adownload_bill(url, output_path, skip_existing=not self.sync)
+
+    def download_bill(self, url: str, output_path: Path,
+                      skip_existing: bool = True, probe: bool = False) -> bool:
+        """Download a single bill on the shared event loop."""
+        return self._loop.run_until_complete(
+            self.adownload_bill(url, output_path, skip_existing, probe)
+        )
+
+    async def _download_all(self, specs: List[Dict]) -> None:
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def run(spec: Dict) -> None:
+            async with semaphore:
+                await self.adownload_bill_spec(spec)
+
+        await asyncio.gather(*(run(spec) for spec in specs))
+
+    def download_specs(self, specs: List[Dict]) -> None:
+        """
+        Download a list of bill specifications.
+
+        Keeps up to ``workers`` downloads in flight as coroutines on the
+        shared connection pool.
+        """
+        try:
+            self._loop.run_until_complete(self._download_all(specs))
+        finally:
+            self._save_state()
 
 
 def main():
@@ -251,6 +1931,117 @@ def main():
         type=float,
         default=1.0
     )
+    parser.add_argument(
+        '--workers',
+        help='Number of concurrent downloads (requests still share the --delay rate budget)',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--sync',
+        help='Re-check existing files with conditional GETs and refresh changed ones',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--no-hash',
+        help='Skip computing SHA-256 digests while downloading',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--discover',
+        help='Range mode: request only bills that exist (uses directory listings, '
+             'skips known 404s and finds substitute versions)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--negative-ttl',
+        help='--discover probing: days to remember a 404 before requesting that URL again',
+        type=float,
+        default=7.0
+    )
+    parser.add_argument(
+        '--backend',
+        help='HTTP backend: requests on worker threads, or asyncio/aiohttp',
+        choices=['threads', 'async'],
+        default='threads'
+    )
+    parser.add_argument(
+        '--pool-size',
+        help='Keep-alive connections per host, shared by all workers (default: max(10, workers))',
+        type=int
+    )
+    parser.add_argument(
+        '--keepalive',
+        help='Async backend: seconds an idle pooled connection is kept open',
+        type=float,
+        default=30.0
+    )
+    parser.add_argument(
+        '--timeout',
+        help='Per-request timeout in seconds',
+        type=float,
+        default=30.0
+    )
+    parser.add_argument(
+        '--journal',
+        help='SQLite journal of download outcomes '
+             '(default: <output-dir>/.download-journal.sqlite3, "" to disable)'
+    )
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument(
+        '--resume',
+        help="Continue this job's last run, skipping URLs it already settled",
+        action='store_const', const='resume', dest='resume'
+    )
+    resume_group.add_argument(
+        '--retry-failed',
+        help="Continue this job's last run, retrying only URLs that failed",
+        action='store_const', const='failed', dest='resume'
+    )
+    parser.add_argument(
+        '--dedupe',
+        help='Store file bodies once under <output-dir>/.objects and link the '
+             'mirrored paths to them',
+        choices=BlobStore.MODES
+    )
+    parser.add_argument(
+        '--dedupe-tree',
+        help='Deduplicate the existing files under --output-dir and exit '
+             '(uses --dedupe mode, hardlink by default)',
+        action='store_true'
+    )
+    parser.add_argument(
+        '--metrics',
+        help='Append per-request metrics (latency, bytes, retries, rate-limit wait) '
+             'to this JSON lines file'
+    )
+    parser.add_argument(
+        '--search-index',
+        help='Add downloaded XML/HTM bills to an SQLite full-text index as they are saved; '
+             'also the index of --index-tree and --search '
+             '(default path: <output-dir>/.search-index.sqlite3)',
+        nargs='?',
+        const='',
+        metavar='PATH'
+    )
+    parser.add_argument(
+        '--index-tree',
+        help='Index the XML/HTM bills under --output-dir and the given directories '
+             '(only new or changed files) and exit',
+        nargs='*',
+        metavar='DIR'
+    )
+    parser.add_argument(
+        '--search',
+        help='Search the index (FTS5 syntax: "exact phrase", prefix*, AND/OR/NOT) and exit',
+        metavar='QUERY'
+    )
+    parser.add_argument(
+        '--limit',
+        help='Maximum number of sections printed by --search',
+        type=int,
+        default=20
+    )
     parser.add_argument(
         '--biennium',
         help='Biennium (e.g., 2023-24) for range download'
@@ -272,38 +2063,91 @@ def main():
     )
     parser.add_argument(
         '--format',
-        help='Format type (Pdf or Htm)',
-        choices=['Pdf', 'Htm'],
+        help='Format type (Pdf, Htm or Xml)',
+        choices=list(WABillDownloader.FORMAT_EXTENSIONS),
         default='Pdf'
     )
 
     args = parser.parse_args()
 
-    downloader = WABillDownloader(
+    if args.dedupe_tree:
+        store = BlobStore(Path(args.output_dir), args.dedupe or 'hardlink')
+        print(f"♻️  Deduplicating {args.output_dir} ({store.mode}s)")
+        result = store.dedupe_tree()
+        print(f"   Files scanned: {result['files']}")
+        print(f"   Duplicates: {result['duplicates']}")
+        print(f"   Saved: {result['bytes_saved'] / 1_000_000:.1f} MB")
+        return
+
+    search_index_path = args.search_index or str(Path(args.output_dir) / SearchIndex.FILENAME)
+    if args.index_tree is not None or args.search:
+        index = SearchIndex(Path(search_index_path))
+        try:
+            if args.index_tree is not None:
+                for directory in [args.output_dir] + args.index_tree:
+                    started = time.perf_counter()
+                    result = index.update_tree(Path(directory))
+                    print(f"🔎 Indexed {directory}: {result['indexed']} of {result['files']} files "
+                          f"new or changed, {result['removed']} removed "
+                          f"({time.perf_counter() - started:.1f}s)")
+            if args.search:
+                started = time.perf_counter()
+                try:
+                    hits = index.search(args.search, args.limit)
+                except sqlite3.OperationalError as e:
+                    print(f"❌ Invalid query: {e}")
+                    sys.exit(1)
+                print(f"🔎 {len(hits)} sections ({(time.perf_counter() - started) * 1000:.1f} ms)")
+                for hit in hits:
+                    print(f"{hit['bill']:<12} {hit['section'] or '-':<10} {hit['path']}")
+                    print(f"   {hit['snippet']}")
+        finally:
+            index.close()
+        return
+
+    downloader_class = AsyncWABillDownloader if args.backend == 'async' else WABillDownloader
+    backend_options = {'keepalive': args.keepalive} if args.backend == 'async' else {}
+    downloader = downloader_class(
         output_dir=args.output_dir,
-        delay=args.delay
+        delay=args.delay,
+        workers=args.workers,
+        sync=args.sync,
+        hash_files=not args.no_hash,
+        negative_ttl=args.negative_ttl * 86400,
+        timeout=args.timeout,
+        pool_size=args.pool_size,
+        journal_path=args.journal,
+        resume=args.resume,
+        dedupe=args.dedupe,
+        metrics_path=args.metrics,
+        search_index_path=search_index_path if args.search_index is not None else None,
+        **backend_options
     )
 
-    # Range download mode
-    if args.biennium and args.chamber and args.start and args.end:
-        downloader.download_range(
-            args.biennium,
-            args.chamber,
-            args.start,
-            args.end,
-            args.format
-        )
-    # Config file mode
-    elif os.path.exists(args.config):
-        downloader.download_from_config(args.config)
-    else:
-        print(f"❌ Config file not found: {args.config}")
-        print("\nUsage examples:")
-        print("  # Download from config file:")
-        print(f"  python {sys.argv[0]} --config bills_config.json")
-        print("\n  # Download range of bills:")
-        print(f"  python {sys.argv[0]} --biennium 2023-24 --chamber House --start 1000 --end 1010")
-        sys.exit(1)
+    try:
+        # Range download mode
+        if args.biennium and args.chamber and args.start and args.end:
+            downloader.download_range(
+                args.biennium,
+                args.chamber,
+                args.start,
+                args.end,
+                args.format,
+                discover=args.discover
+            )
+        # Config file mode
+        elif os.path.exists(args.config):
+            downloader.download_from_config(args.config)
+        else:
+            print(f"❌ Config file not found: {args.config}")
+            print("\nUsage examples:")
+            print("  # Download from config file:")
+            print(f"  python {sys.argv[0]} --config bills_config.json")
+            print("\n  # Download range of bills:")
+            print(f"  python {sys.argv[0]} --biennium 2023-24 --chamber House --start 1000 --end 1010")
+            sys.exit(1)
+    finally:
+        downloader.close()
 
 
 if __name__ == "__main__":